@@ -0,0 +1,17 @@
+"""API-only entry point: serves requests without scraping or summarizing.
+
+Runs the same app as ``server:app`` with the scheduler and summary workers
+switched off, so replicas added to absorb read traffic boot without the
+scraping libraries, the LLM client or the extract pool. Pair it with
+``worker.py`` for the background work.
+
+Usage: uvicorn api:app --host 0.0.0.0 --port 8001
+"""
+import os
+
+os.environ['SCHEDULER_ENABLED'] = 'false'
+os.environ['SUMMARY_WORKERS'] = '0'
+
+from server import app  # noqa: E402
+
+__all__ = ["app"]
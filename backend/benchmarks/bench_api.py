@@ -0,0 +1,121 @@
+"""Latency percentiles for GET /api/articles and POST /api/auth/login.
+
+For each ``--sizes`` value the benchmark database is filled with that many
+published articles, then through the ASGI app it times:
+
+* first pages of /api/articles per category with the response cache
+  cleared before each request, served by the articles query (query cost)
+  and by the materialized category timelines, then left warm (cache hits), and
+* ``--logins`` POST /api/auth/login calls, ``--concurrency`` at a time,
+  against ``--users`` seeded accounts.
+
+Usage: python -m benchmarks.bench_api [--sizes 1000 10000] [--requests N] [--users N]
+       [--logins N] [--concurrency C] [--db mongo|memory]
+(run from the backend directory).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.common import CATEGORIES, percentile, synthetic_article, use_memory_database
+
+import server
+
+EMAIL_DOMAIN = "bench.nooz.news"
+PASSWORD = "bench-password"
+
+
+async def fill_articles(size: int, rng: random.Random, batch: int = 5000):
+    current = await server.db.articles.count_documents({})
+    while current < size:
+        count = min(batch, size - current)
+        await server.db.articles.insert_many([synthetic_article(current + i, rng) for i in range(count)], ordered=False)
+        current += count
+
+
+async def seed_users(count: int) -> list:
+    await server.db.users.delete_many({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}})
+    password_hash = server.hash_password(PASSWORD)
+    users = [
+        server.User(email=f"user{n}@{EMAIL_DOMAIN}", display_name=f"user{n}").model_dump() | {"password_hash": password_hash}
+        for n in range(count)
+    ]
+    await server.db.users.insert_many(users)
+    return users
+
+
+def summarize(latencies: list) -> dict:
+    return {"p50_ms": percentile(latencies, 50), "p90_ms": percentile(latencies, 90), "p99_ms": percentile(latencies, 99)}
+
+
+async def time_articles(api: httpx.AsyncClient, requests: int, cached: bool, rng: random.Random) -> dict:
+    latencies = []
+    for _ in range(requests):
+        if not cached:
+            server.response_cache.clear()
+        params = {"limit": 20, "category": rng.choice(CATEGORIES)}
+        start = time.perf_counter()
+        (await api.get("/api/articles", params=params)).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize(latencies)
+
+
+async def time_logins(api: httpx.AsyncClient, users: list, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def login(n: int):
+        async with semaphore:
+            user = users[n % len(users)]
+            start = time.perf_counter()
+            response = await api.post("/api/auth/login", json={"email": user['email'], "password": PASSWORD})
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(n) for n in range(logins)))
+    return {**summarize(latencies), "logins_per_second": logins / (time.perf_counter() - start)}
+
+
+async def main(sizes: list, requests: int, user_count: int, logins: int, concurrency: int) -> dict:
+    rng = random.Random(42)
+    await server.db.articles.drop()
+    await server.db.articles.create_index([("categories", 1), ("status", 1), ("created_at", -1), ("id", -1)])
+    users = await seed_users(user_count)
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+            for size in sorted(sizes):
+                await fill_articles(size, rng)
+                await server.db.category_timelines.drop()
+                results[size] = {"articles_uncached": await time_articles(api, requests, False, rng)}
+                await server.rebuild_category_timelines()
+                results[size] |= {
+                    "articles_timeline": await time_articles(api, requests, False, rng),
+                    "articles_cached": await time_articles(api, requests, True, rng),
+                    "login": await time_logins(api, users, logins, concurrency),
+                }
+                for name, timing in results[size].items():
+                    print(f"{size:>9} articles  {name:<18} p50 {timing['p50_ms']:7.1f}ms  p99 {timing['p99_ms']:7.1f}ms")
+    finally:
+        await server.db.users.delete_many({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}})
+        await server.db.category_timelines.drop()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--requests', type=int, default=200, help="article requests per size and cache mode")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--db', choices=['mongo', 'memory'], default='mongo')
+    args = parser.parse_args()
+    if args.db == 'memory':
+        use_memory_database()
+    asyncio.run(main(args.sizes, args.requests, args.users, args.logins, args.concurrency))
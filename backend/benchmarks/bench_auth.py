@@ -0,0 +1,91 @@
+"""Load test for login throughput and authenticated-endpoint latency.
+
+Seeds ``--users`` accounts in the benchmark database (MONGO_URL/BENCH_DB_NAME,
+default ``nooz_bench``), then runs through the ASGI app:
+
+* ``--logins`` concurrent POST /api/auth/login calls (bcrypt-bound), and
+* GET /api/auth/me probes issued *while* those logins run, which shows how
+  much password hashing stalls ordinary authenticated requests.
+
+Usage: python -m benchmarks.bench_auth [--users N] [--logins N] [--concurrency C]
+(run from the backend directory with MongoDB available).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import percentile
+
+import server
+
+EMAIL_DOMAIN = "bench.nooz.news"
+PASSWORD = "bench-password"
+
+
+async def seed_users(count: int) -> list:
+    await server.db.users.delete_many({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}})
+    password_hash = server.hash_password(PASSWORD)
+    users = [
+        server.User(email=f"user{n}@{EMAIL_DOMAIN}", display_name=f"user{n}").model_dump() | {"password_hash": password_hash}
+        for n in range(count)
+    ]
+    await server.db.users.insert_many(users)
+    return users
+
+
+async def main(user_count: int, logins: int, concurrency: int) -> dict:
+    users = await seed_users(user_count)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+        token = server.create_access_token({"sub": users[0]['id'], "email": users[0]['email']})
+        auth = {"Authorization": f"Bearer {token}"}
+        semaphore = asyncio.Semaphore(concurrency)
+        me_latencies = []
+        done = asyncio.Event()
+
+        async def login(n: int):
+            async with semaphore:
+                user = users[n % len(users)]
+                response = await api.post("/api/auth/login", json={"email": user['email'], "password": PASSWORD})
+                response.raise_for_status()
+
+        async def probe_me():
+            while not done.is_set():
+                start = time.perf_counter()
+                (await api.get("/api/auth/me", headers=auth)).raise_for_status()
+                me_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        async def run_logins():
+            try:
+                await asyncio.gather(*(login(n) for n in range(logins)))
+            finally:
+                done.set()
+
+        start = time.perf_counter()
+        await asyncio.gather(run_logins(), probe_me())
+        elapsed = time.perf_counter() - start
+
+    await server.db.users.delete_many({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}})
+    result = {
+        "logins_per_second": logins / elapsed,
+        "me_p50_ms": percentile(me_latencies, 50),
+        "me_p99_ms": percentile(me_latencies, 99),
+        "me_requests": len(me_latencies),
+        "user_cache": server.user_cache.stats(),
+    }
+    print(f"login throughput: {result['logins_per_second']:.1f}/s over {logins} logins")
+    print(f"/api/auth/me during logins: p50 {result['me_p50_ms']:.1f}ms  p99 {result['me_p99_ms']:.1f}ms")
+    print(f"user cache: {result['user_cache']}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.logins, args.concurrency))
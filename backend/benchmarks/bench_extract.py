@@ -0,0 +1,148 @@
+"""Extraction time and text quality over a corpus of saved article pages.
+
+``--corpus DIR`` holds ``<name>.html`` pages, each optionally with a
+``<name>.txt`` holding the expected article text and a ``<name>.rules.json``
+holding ExtractionRules for that page's source. Without ``--corpus`` a
+synthetic corpus with navigation, sidebars, comment threads and related-link
+blocks around the real text is generated.
+
+Each page is extracted with the previous single-heuristic BeautifulSoup
+extractor and with the extractor registry; reported are per-page time
+percentiles, token precision/recall/F1 against the expected text, and
+which registry extractor produced each page.
+
+Usage: python -m benchmarks.bench_extract [--corpus DIR] [--pages N] [--rounds N]
+(run from the backend directory).
+"""
+import argparse
+import json
+import random
+import re
+from collections import Counter
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from benchmarks.common import Timer, percentile, synthetic_words
+
+import server
+
+TOKEN = re.compile(r"\w+")
+
+
+def legacy_extract(html: str, url: str) -> str:
+    """Content extraction as it was before the extractor registry."""
+    soup = BeautifulSoup(html, 'lxml')
+    for element in soup(["script", "style", "nav", "header", "footer"]):
+        element.decompose()
+    content = None
+    for tag in ['article', 'main', 'div[class*="content"]']:
+        element = soup.find(tag)
+        if element:
+            content = element.get_text(separator='\n', strip=True)
+            break
+    if not content:
+        content = soup.get_text(separator='\n', strip=True)
+    return '\n'.join(line.strip() for line in content.split('\n') if line.strip())[:15000]
+
+
+def registry_extract(html: str, url: str, rules: dict) -> tuple:
+    content, _, _, extractor = server.parse_article_html(html, url, rules)
+    return content or "", extractor
+
+
+def token_scores(extracted: str, expected: str) -> dict:
+    got, want = Counter(TOKEN.findall(extracted.lower())), Counter(TOKEN.findall(expected.lower()))
+    overlap = sum((got & want).values())
+    precision = overlap / max(1, sum(got.values()))
+    recall = overlap / max(1, sum(want.values()))
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def synthetic_page(n: int, rng: random.Random) -> tuple:
+    paragraphs = [synthetic_words(rng, rng.randint(30, 70)).capitalize() + "." for _ in range(rng.randint(6, 20))]
+    expected = "\n".join(paragraphs)
+    links = "".join(f"<li><a href='/story/{i}'>{synthetic_words(rng, 8)}</a></li>" for i in range(12))
+    comments = "".join(f"<div class='comment'><p>{synthetic_words(rng, 25)}</p></div>" for _ in range(rng.randint(0, 15)))
+    body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    # Vary the markup so every extractor path gets exercised
+    layout = n % 3
+    if layout == 0:
+        main = f"<article><h1>Story {n}</h1>{body}</article>"
+    elif layout == 1:
+        main = f"<div class='story-content'>{body}</div>"
+    else:
+        main = f"<div id='wrap'><div class='c{n}'>{body}</div></div>"
+    html = (
+        f"<html><head><title>Story {n}</title><meta property='og:image' content='/img/{n}.jpg'>"
+        f"<script>var tracking = {n};</script></head><body><nav><ul>{links}</ul></nav>"
+        f"<div class='sidebar'><ul>{links}</ul></div>{main}"
+        f"<section class='comments'>{comments}</section><div class='related'><ul>{links}</ul></div>"
+        "<footer>Copyright</footer></body></html>"
+    )
+    return f"synthetic-{n}", html, expected, {}
+
+
+def load_corpus(corpus: Path) -> list:
+    pages = []
+    for path in sorted(corpus.glob("*.html")):
+        expected_path = path.with_suffix(".txt")
+        rules_path = path.with_suffix(".rules.json")
+        pages.append((
+            path.stem,
+            path.read_text(encoding='utf-8', errors='replace'),
+            expected_path.read_text(encoding='utf-8') if expected_path.exists() else None,
+            json.loads(rules_path.read_text()) if rules_path.exists() else {},
+        ))
+    return pages
+
+
+def main(corpus: Path = None, page_count: int = 200, rounds: int = 3) -> dict:
+    rng = random.Random(42)
+    pages = load_corpus(corpus) if corpus else [synthetic_page(n, rng) for n in range(page_count)]
+    url = "https://bench.nooz.news/story"
+    results = {}
+    extractors = Counter()
+
+    for name in ("legacy", "registry"):
+        times, scores = [], []
+        for round_index in range(rounds):
+            for page_name, html, expected, rules in pages:
+                with Timer() as timer:
+                    if name == "legacy":
+                        text = legacy_extract(html, url)
+                    else:
+                        text, extractor = registry_extract(html, url, rules)
+                times.append(timer.elapsed * 1000)
+                if round_index == 0:
+                    if name == "registry":
+                        extractors[extractor or "none"] += 1
+                    if expected is not None:
+                        scores.append(token_scores(text, expected))
+        results[name] = {
+            "p50_ms": percentile(times, 50),
+            "p99_ms": percentile(times, 99),
+            **{
+                metric: sum(score[metric] for score in scores) / len(scores) if scores else None
+                for metric in ("precision", "recall", "f1")
+            },
+        }
+    results["registry"]["extractors"] = dict(extractors)
+
+    print(f"{len(pages)} pages, {rounds} rounds")
+    for name in ("legacy", "registry"):
+        result = results[name]
+        quality = f"P {result['precision']:.3f}  R {result['recall']:.3f}  F1 {result['f1']:.3f}" if result['f1'] is not None else "no expected text"
+        print(f"  {name:<9} p50 {result['p50_ms']:6.2f}ms  p99 {result['p99_ms']:6.2f}ms  {quality}")
+    print(f"  extractors used: {dict(extractors)}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--corpus', type=Path, default=None, help="directory of saved .html pages")
+    parser.add_argument('--pages', type=int, default=200, help="synthetic pages when no corpus is given")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    main(args.corpus, args.pages, args.rounds)
@@ -0,0 +1,93 @@
+"""API p50/p99 latency while a scrape is parsing large pages, inline vs. process pool.
+
+A probe calls GET /api/ through the ASGI app every 10 ms on the same event
+loop that is running article extraction. Latency is measured from each
+probe's scheduled send time, so time the loop spends blocked in parsing
+is counted rather than hidden.
+
+Usage: python -m benchmarks.bench_extract_pool [--pages N] [--paragraphs P] [--workers W]
+(run from the backend directory).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from aiohttp import web
+
+from benchmarks.common import StubServer, percentile
+
+import server
+
+
+def make_page(paragraphs: int) -> str:
+    body = "".join(f"<p>Paragraph {i} with some words, commas and <a href='/x'>links</a>.</p>" for i in range(paragraphs))
+    return (
+        "<html><head><meta property='og:image' content='https://img.example/a.jpg'></head>"
+        f"<body><nav>menu</nav><article>{body}</article><footer>footer</footer></body></html>"
+    )
+
+
+async def measure(url: str, pages: int, workers: int) -> dict:
+    server.EXTRACT_WORKERS = workers
+    server.shutdown_extract_pool()
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await api.get("/api/")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+                scheduled += 0.01
+
+    async def scrape():
+        try:
+            await asyncio.gather(*(server.extract_article_content(f"{url}?n={n}") for n in range(pages)))
+        finally:
+            done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(probe(), scrape())
+    elapsed = time.perf_counter() - start
+    server.shutdown_extract_pool()
+    return {
+        "workers": workers,
+        "scrape_seconds": elapsed,
+        "api_p50_ms": percentile(latencies, 50),
+        "api_p99_ms": percentile(latencies, 99),
+        "api_max_ms": max(latencies) if latencies else 0.0,
+        "probes": len(latencies),
+    }
+
+
+async def main(pages: int, paragraphs: int, workers: int):
+    page = make_page(paragraphs)
+
+    async def handle_page(request):
+        return web.Response(text=page, content_type='text/html')
+
+    async with StubServer([('GET', '/article', handle_page)]) as stub:
+        url = stub.url('/article')
+        before = await measure(url, pages, 0)
+        after = await measure(url, pages, workers)
+        await server.close_http_session()
+    for label, result in (("inline", before), (f"pool({workers})", after)):
+        print(
+            f"{label:10s} scrape {result['scrape_seconds']:6.2f}s  "
+            f"API p50 {result['api_p50_ms']:7.1f}ms  p99 {result['api_p99_ms']:7.1f}ms  "
+            f"max {result['api_max_ms']:7.1f}ms"
+        )
+    return {"inline": before, "pool": after}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--paragraphs', type=int, default=3000)
+    parser.add_argument('--workers', type=int, default=server.EXTRACT_WORKERS or 2)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.paragraphs, args.workers))
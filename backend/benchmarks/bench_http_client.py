@@ -0,0 +1,64 @@
+"""Requests/sec for a session-per-request client vs. the shared pooled session.
+
+Usage: python -m benchmarks.bench_http_client [--requests N] [--concurrency C]
+(run from the backend directory).
+"""
+import argparse
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.common import StubServer, Timer
+
+import server
+
+PAGE = "<html><body><article>" + "<p>Lorem ipsum dolor sit amet.</p>" * 50 + "</article></body></html>"
+
+
+async def handle_page(request):
+    return web.Response(text=PAGE, content_type='text/html')
+
+
+async def fetch_with_new_session(url: str):
+    # The pre-pooling pattern: a fresh connector for every fetch.
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
+            await response.text()
+
+
+async def fetch_with_shared_session(url: str):
+    session = await server.get_http_session()
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
+        await response.text()
+
+
+async def run(fetch, url: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await fetch(url)
+
+    with Timer() as timer:
+        await asyncio.gather(*(one() for _ in range(total)))
+    return total / timer.elapsed
+
+
+async def main(total: int, concurrency: int):
+    async with StubServer([('GET', '/page', handle_page)]) as stub:
+        url = stub.url('/page')
+        before = await run(fetch_with_new_session, url, total, concurrency)
+        after = await run(fetch_with_shared_session, url, total, concurrency)
+        await server.close_http_session()
+    print(f"session per request: {before:8.1f} req/s")
+    print(f"shared session:      {after:8.1f} req/s  ({after / before:.2f}x)")
+    return {"before_rps": before, "after_rps": after}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
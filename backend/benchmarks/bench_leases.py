@@ -0,0 +1,187 @@
+"""Multi-process scraping and summarization against one shared MongoDB.
+
+For each ``--processes`` count, starts that many worker processes against
+the MongoDB at MONGO_URL/DB_NAME and checks that leases keep them from
+doing the same work twice:
+
+* scrape: ``--sources`` feeds of ``--items`` articles are served by a local
+  stub server and every process runs its own SourceScheduler over them;
+  reported are feed and page fetches against the distinct ones and the time
+  until every source has been scraped.
+* summarize: ``--articles`` pending articles are queued and every process
+  runs ``--workers`` summary workers against a fake LLM answering after
+  ``--latency`` seconds; reported are LLM calls and summaries per article
+  and articles/s, whose growth with the process count shows the scaling.
+
+A real MongoDB server is required, since the in-memory database cannot be
+shared between processes. Use a dedicated database: the schedulers pick up
+every active source in it.
+
+Usage: python -m benchmarks.bench_leases [--processes 1 2 4] [--sources N] [--items N]
+       [--articles N] [--workers N] [--latency S]
+(run from the backend directory with MONGO_URL pointing at a local MongoDB).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+
+from benchmarks.common import FakeLlmChat, StubServer, delete_articles, install_fake_llm, synthetic_article, synthetic_feed_routes
+
+import server
+
+SOURCE_PREFIX = "bench-lease-source-"
+URL_PREFIX = "https://bench.nooz.news/leases/"
+
+
+def worker_process(mode: str, barrier, stop, results, latency: float, workers: int):
+    asyncio.run(run_worker(mode, barrier, stop, results, latency, workers))
+
+
+async def run_worker(mode: str, barrier, stop, results, latency: float, workers: int):
+    install_fake_llm(latency)
+    pool = server.SummaryWorkerPool(workers)
+    await asyncio.to_thread(barrier.wait)
+    if mode == "scrape":
+        await server.scheduler.start()
+    else:
+        pool.start()
+    while not stop.is_set():
+        await asyncio.sleep(0.05)
+    if mode == "scrape":
+        await server.scheduler.stop()
+    else:
+        await pool.stop()
+    await server.close_http_session()
+    server.shutdown_extract_pool()
+    results.put({"pid": os.getpid(), "llm_calls": FakeLlmChat.calls})
+
+
+async def run_processes(mode: str, processes: int, done, latency: float, workers: int, timeout: float = 600) -> tuple:
+    """Start the workers together and stop them once ``done()`` is true; returns (seconds, reports)."""
+    context = multiprocessing.get_context("spawn")
+    barrier, stop, results = context.Barrier(processes + 1), context.Event(), context.Queue()
+    children = [
+        context.Process(target=worker_process, args=(mode, barrier, stop, results, latency, workers))
+        for _ in range(processes)
+    ]
+    for child in children:
+        child.start()
+    await asyncio.to_thread(barrier.wait)
+    start = time.perf_counter()
+    while not await done():
+        if time.perf_counter() - start > timeout:
+            stop.set()
+            raise RuntimeError(f"{mode} with {processes} processes did not finish within {timeout:.0f}s")
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reports = [await asyncio.to_thread(results.get, True, 60) for _ in children]
+    for child in children:
+        await asyncio.to_thread(child.join)
+    return elapsed, reports
+
+
+async def bench_scrape(processes: int, source_count: int, items: int, hits: dict, stub: StubServer) -> dict:
+    source_ids = [f"{SOURCE_PREFIX}{n}" for n in range(source_count)]
+    await server.db.sources.delete_many({"id": {"$in": source_ids}})
+    await delete_articles({"source_id": {"$in": source_ids}})
+    await server.db.sources.insert_many([
+        server.Source(
+            id=source_id, name=f"Lease Source {n}", rss_url=stub.url(f"/feeds/{n}"), categories=["AI"], scrape_interval_minutes=60
+        ).model_dump()
+        for n, source_id in enumerate(source_ids)
+    ])
+    hits.clear()
+
+    async def done():
+        return await server.db.sources.count_documents({"id": {"$in": source_ids}, "last_scrape": {"$ne": None}}) == source_count
+
+    try:
+        elapsed, _ = await run_processes("scrape", processes, done, 0, 0)
+    finally:
+        # Scraped articles were queued for summaries; their jobs go too
+        await server.db.sources.delete_many({"id": {"$in": source_ids}})
+        await delete_articles({"source_id": {"$in": source_ids}})
+    feeds = sum(count for path, count in hits.items() if path.startswith("/feeds/"))
+    pages = sum(count for path, count in hits.items() if path.startswith("/articles/"))
+    return {
+        "seconds": elapsed,
+        "sources_per_second": source_count / elapsed,
+        "feed_fetches": feeds,
+        "page_fetches": pages,
+        "duplicate_fetches": sum(count - 1 for count in hits.values() if count > 1),
+    }
+
+
+async def bench_summarize(processes: int, count: int, workers: int, latency: float) -> dict:
+    rng = random.Random(42)
+    articles = [
+        synthetic_article(n, rng, content_words=200, status="pending", url=f"{URL_PREFIX}{processes}/{n}") for n in range(count)
+    ]
+    article_ids = [article['id'] for article in articles]
+    await server.db.articles.insert_many(articles)
+    await server.enqueue_summaries(article_ids)
+
+    async def done():
+        return await server.db.summary_jobs.count_documents({"article_id": {"$in": article_ids}, "state": "done"}) == count
+
+    try:
+        elapsed, reports = await run_processes("summarize", processes, done, latency, workers)
+        summaries = await server.db.summaries.count_documents({"article_id": {"$in": article_ids}})
+    finally:
+        await server.db.articles.delete_many({"id": {"$in": article_ids}})
+        await server.db.summaries.delete_many({"article_id": {"$in": article_ids}})
+        await server.db.summary_jobs.delete_many({"article_id": {"$in": article_ids}})
+    llm_calls = sum(report['llm_calls'] for report in reports)
+    return {
+        "seconds": elapsed,
+        "articles_per_second": count / elapsed,
+        "llm_calls_per_article": llm_calls / count,
+        "summaries_per_article": summaries / count,
+    }
+
+
+async def main(process_counts: list, source_count: int, items: int, count: int, workers: int, latency: float) -> dict:
+    # Children read their configuration from the environment at import: no
+    # jitter so every scheduler sees the sources due at once, one article per
+    # LLM call so calls count articles, and no LLM rate limit
+    os.environ.update({"SCHEDULER_JITTER_SECONDS": "0", "SUMMARY_BATCH_MAX_ARTICLES": "1", "SUMMARY_RATE_PER_MINUTE": "0"})
+    await server.db.articles.create_index("url", unique=True)
+    await server.db.summary_jobs.create_index("article_id", unique=True)
+
+    hits = {}
+
+    def counted(handler):
+        async def handle(request):
+            hits[request.path] = hits.get(request.path, 0) + 1
+            return await handler(request)
+        return handle
+
+    results = {}
+    routes = [(method, path, counted(handler)) for method, path, handler in synthetic_feed_routes(items)]
+    async with StubServer(routes) as stub:
+        for processes in process_counts:
+            scrape = await bench_scrape(processes, source_count, items, hits, stub)
+            summarize = await bench_summarize(processes, count, workers, latency)
+            results[processes] = {"scrape": scrape, "summarize": summarize}
+            print(f"{processes} processes  scrape {scrape['sources_per_second']:6.1f} sources/s  "
+                  f"{scrape['feed_fetches']}/{source_count} feeds  {scrape['page_fetches']}/{source_count * items} pages  "
+                  f"{scrape['duplicate_fetches']} duplicates")
+            print(f"{'':<11}  summarize {summarize['articles_per_second']:6.1f} articles/s  "
+                  f"{summarize['llm_calls_per_article']:.2f} LLM calls/article  {summarize['summaries_per_article']:.2f} summaries/article")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--sources', type=int, default=40)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4, help="summary workers per process")
+    parser.add_argument('--latency', type=float, default=0.2, help="fake LLM response time in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.processes, args.sources, args.items, args.articles, args.workers, args.latency))
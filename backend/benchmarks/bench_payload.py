@@ -0,0 +1,86 @@
+"""Payload size and serialization time for a 100-article page.
+
+Builds a page of synthetic articles shaped like scraped ones (15,000
+character bodies, attached summaries) and compares the full documents with
+the lean list shape: bytes on the wire raw/gzip/brotli, and the time to
+serialize the page with the previous path (jsonable_encoder + json) versus
+orjson. No database or network is needed.
+
+Usage: python -m benchmarks.bench_payload [--articles 100] [--rounds 200]
+(run from the backend directory).
+"""
+import argparse
+import json
+import random
+import uuid
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.common import Timer, percentile, synthetic_article, synthetic_words
+
+import server
+
+
+def page_article(n: int, rng: random.Random) -> dict:
+    article = synthetic_article(n, rng, content_words=2200)
+    article['summary'] = {
+        "id": str(uuid.uuid4()),
+        "article_id": article['id'],
+        "executive_summary": synthetic_words(rng, 60),
+        "key_points": [synthetic_words(rng, 10) for _ in range(4)],
+        "analysis": synthetic_words(rng, 80),
+        "takeaways": [synthetic_words(rng, 8) for _ in range(3)],
+        "summary_read_time_minutes": 1,
+        "created_at": article['created_at'],
+    }
+    return article
+
+
+def lean(article: dict) -> dict:
+    excluded = {field for field, value in server.ARTICLE_LIST_PROJECTION.items() if not value}
+    return {field: value for field, value in article.items() if field not in excluded}
+
+
+def time_serializer(serialize, page: list, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        with Timer() as timer:
+            serialize(page)
+        samples.append(timer.elapsed * 1000)
+    return {"p50_ms": percentile(samples, 50), "p99_ms": percentile(samples, 99)}
+
+
+SERIALIZERS = {
+    "jsonable_encoder+json": lambda page: json.dumps(jsonable_encoder(page)).encode('utf-8'),
+    "json": lambda page: json.dumps(page, separators=(',', ':'), default=str).encode('utf-8'),
+    "orjson": lambda page: orjson.dumps(page, default=str),
+}
+
+
+def main(count: int, rounds: int) -> dict:
+    rng = random.Random(42)
+    full_page = [page_article(n, rng) for n in range(count)]
+    pages = {"full": full_page, "lean": [lean(article) for article in full_page]}
+
+    results = {}
+    for shape, page in pages.items():
+        body = orjson.dumps(page)
+        sizes = {"raw": len(body), "gzip": len(server.compress_body(body, "gzip"))}
+        if server.brotli is not None:
+            sizes["br"] = len(server.compress_body(body, "br"))
+        timings = {name: time_serializer(serialize, page, rounds) for name, serialize in SERIALIZERS.items()}
+        results[shape] = {"bytes": sizes, "serialize": timings}
+
+        print(f"{shape} page ({count} articles): " + "  ".join(f"{k} {v / 1024:8.1f} KiB" for k, v in sizes.items()))
+        for name, timing in timings.items():
+            print(f"  {name:<22} p50 {timing['p50_ms']:7.2f}ms  p99 {timing['p99_ms']:7.2f}ms")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    main(args.articles, args.rounds)
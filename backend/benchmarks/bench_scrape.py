@@ -0,0 +1,94 @@
+"""Throughput of scrape_source over synthetic feeds served locally.
+
+Starts a stub HTTP server with ``--sources`` RSS feeds of ``--items``
+articles each, then scrapes all of them concurrently through
+``scrape_sources`` (fetch, extraction pool, dedup and insert) for
+``--rounds`` rounds, clearing the stored articles between rounds.
+Besides throughput, reports the article page bytes downloaded against the
+bytes kept as article text; ``--tail-links`` pads every page after its
+article with that many related links.
+
+Usage: python -m benchmarks.bench_scrape [--sources N] [--items N] [--rounds N] [--tail-links N] [--db mongo|memory]
+(run from the backend directory).
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import StubServer, Timer, delete_articles, exit_on_failures, percentile, synthetic_feed_routes, use_memory_database
+
+import server
+
+
+def bench_sources(stub: StubServer, count: int) -> list:
+    return [
+        {
+            "id": f"bench-source-{n}",
+            "name": f"Bench Source {n}",
+            "rss_url": stub.url(f"/feeds/{n}"),
+            "categories": ["AI"],
+            "priority": "medium",
+            "is_active": True,
+            "scrape_interval_minutes": 60,
+        }
+        for n in range(count)
+    ]
+
+
+async def main(source_count: int, items: int, rounds: int, paragraphs: int = 30, tail_links: int = 0) -> dict:
+    await server.db.articles.create_index("url", unique=True)
+    round_seconds = []
+    added = fetched = used = failed_sources = 0
+    try:
+        async with StubServer(synthetic_feed_routes(items, paragraphs, tail_links=tail_links)) as stub:
+            sources = bench_sources(stub, source_count)
+            # Scrapes take a lease on the stored source document
+            source_ids = [source['id'] for source in sources]
+            await server.db.sources.delete_many({"id": {"$in": source_ids}})
+            await server.db.sources.insert_many([dict(source) for source in sources])
+            for _ in range(rounds):
+                await delete_articles({"source_id": {"$in": source_ids}})
+                with Timer() as timer:
+                    results = await server.scrape_sources(sources)
+                round_seconds.append(timer.elapsed)
+                added += sum(result.articles_added for result in results)
+                fetched += sum(result.page_bytes_fetched for result in results)
+                used += sum(result.page_bytes_used for result in results)
+                failed = [result.status for result in results if result.status != "success"]
+                failed_sources += len(failed)
+                if failed:
+                    print(f"  {len(failed)} sources did not succeed: {failed[:3]}")
+    finally:
+        await server.db.sources.delete_many({"id": {"$regex": "^bench-source-"}})
+        await server.close_http_session()
+        server.shutdown_extract_pool()
+
+    total = sum(round_seconds)
+    result = {
+        "articles_per_second": added / total if total else 0.0,
+        "sources_per_second": source_count * rounds / total if total else 0.0,
+        "round_p50_s": percentile(round_seconds, 50),
+        "round_max_s": max(round_seconds),
+        "articles_added": added,
+        "page_bytes_fetched": fetched,
+        "page_bytes_used": used,
+        "failed": failed_sources,
+    }
+    print(f"scrape: {result['articles_per_second']:.1f} articles/s, {result['sources_per_second']:.2f} sources/s "
+          f"({source_count} sources x {items} items, {rounds} rounds, round p50 {result['round_p50_s']:.2f}s)")
+    print(f"pages: {fetched / 1024:.0f} KiB fetched, {used / 1024:.0f} KiB kept as article text "
+          f"({used / fetched:.0%} used)" if fetched else "pages: nothing fetched")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sources', type=int, default=20)
+    parser.add_argument('--items', type=int, default=25)
+    parser.add_argument('--paragraphs', type=int, default=30, help="paragraphs per article page")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--tail-links', type=int, default=0, help="related links after each article")
+    parser.add_argument('--db', choices=['mongo', 'memory'], default='mongo')
+    args = parser.parse_args()
+    if args.db == 'memory':
+        use_memory_database()
+    exit_on_failures(asyncio.run(main(args.sources, args.items, args.rounds, args.paragraphs, args.tail_links)))
@@ -0,0 +1,64 @@
+"""Query latency of /api/search at increasing collection sizes.
+
+Fills the benchmark database (MONGO_URL/BENCH_DB_NAME, default ``nooz_bench``)
+with synthetic published articles up to each ``--sizes`` value, builds the
+text index, then times a fixed set of queries through the ASGI app.
+
+Usage: python -m benchmarks.bench_search [--sizes 100000 1000000] [--queries N]
+(run from the backend directory with MongoDB available; 1M articles take a
+few GB of disk and several minutes to load).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.common import percentile, synthetic_article
+
+import server
+
+QUERIES = ["ai regulation", "tesla battery", "climate solar grid", "bitcoin market", "court ruling antitrust", "quantum"]
+
+
+async def fill_to(size: int, rng: random.Random, batch: int = 5000):
+    current = await server.db.articles.count_documents({})
+    while current < size:
+        count = min(batch, size - current)
+        await server.db.articles.insert_many([synthetic_article(current + i, rng) for i in range(count)], ordered=False)
+        current += count
+        print(f"  loaded {current}/{size}", end="\r", flush=True)
+    print()
+
+
+async def time_queries(api: httpx.AsyncClient, rounds: int) -> dict:
+    latencies = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            start = time.perf_counter()
+            (await api.get("/api/search", params={"q": q, "limit": 20})).raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(latencies, 50), "p99_ms": percentile(latencies, 99), "queries": len(latencies)}
+
+
+async def main(sizes: list, rounds: int) -> dict:
+    rng = random.Random(42)
+    await server.db.articles.drop()
+    await server.ensure_search_index()
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+        for size in sorted(sizes):
+            await fill_to(size, rng)
+            results[size] = await time_queries(api, rounds)
+            print(f"{size:>9} articles: p50 {results[size]['p50_ms']:7.1f}ms  p99 {results[size]['p99_ms']:7.1f}ms")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=20, help="rounds over the fixed query set")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.queries))
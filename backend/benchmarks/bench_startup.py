@@ -0,0 +1,165 @@
+"""Import time and time to first request of each entry point.
+
+For ``server`` (API plus background work, as deployed so far), ``api``
+(requests only) and ``worker`` (background work only), starts fresh Python
+processes and reports the median over ``--runs`` of:
+
+* import: time to import the entry module, and which of the heavy
+  scraping/LLM libraries that import actually executed;
+* first request: time from spawning the process to the first 200 from
+  ``GET /api/``, or for the worker to its "Worker ready" log line.
+
+Each process gets an inactive placeholder source, so the default sources
+are not seeded and the schedulers have nothing to fetch. With ``--db
+mongo`` only the first run of the first entry finds a database without
+the current schema; the rest take the fast migration path, as replicas
+booting against a migrated database do.
+
+Usage: python -m benchmarks.bench_startup [--entries server api worker] [--runs N] [--db mongo|memory]
+(run from the backend directory; ``--db memory`` needs mongomock-motor).
+"""
+import argparse
+import json
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import BACKEND_DIR
+
+ENTRIES = ("server", "api", "worker")
+HEAVY_MODULES = ("aiohttp", "feedparser", "lxml.etree", "lxml.html", "cssselect", "emergentintegrations.llm.chat")
+
+IMPORT_PROBE = """
+import json, sys, time, types
+start = time.perf_counter()
+import {entry}
+elapsed = time.perf_counter() - start
+# Lazily imported modules sit in sys.modules as placeholders until first use
+loaded = [name for name in {heavy!r} if type(sys.modules.get(name)) is types.ModuleType]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+SERVE = """
+import asyncio, importlib, os, sys
+entry, port, database = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+module = importlib.import_module(entry)
+import server
+
+async def main():
+    if database == 'memory':
+        from mongomock_motor import AsyncMongoMockClient
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[os.environ['DB_NAME']]
+    await server.db.sources.update_one(
+        {"id": "bench-startup-placeholder"},
+        {"$setOnInsert": {"name": "Startup benchmark placeholder", "rss_url": "http://127.0.0.1:9/", "categories": [],
+                          "is_active": False, "created_at": server.utc_iso()}},
+        upsert=True,
+    )
+    if entry == 'worker':
+        await module.main()
+    else:
+        import uvicorn
+        await uvicorn.Server(uvicorn.Config(module.app, host='127.0.0.1', port=port, log_level='warning')).serve()
+
+asyncio.run(main())
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(entry: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(entry=entry, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def wait_for_api(process: subprocess.Popen, port: int, timeout: float):
+    url = f"http://127.0.0.1:{port}/api/"
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("exited before serving a request")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"no response within {timeout:.0f}s")
+
+
+def wait_for_worker(process: subprocess.Popen, timeout: float):
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.start()
+    try:
+        for line in process.stderr:
+            if "Worker ready" in line:
+                return
+    finally:
+        watchdog.cancel()
+    raise RuntimeError("exited before reporting ready")
+
+
+def measure_first_request(entry: str, database: str, timeout: float = 60) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVE, entry, str(port), database],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        if entry == "worker":
+            wait_for_worker(process, timeout)
+        else:
+            wait_for_api(process, port, timeout)
+        elapsed = time.perf_counter() - start
+    except RuntimeError as e:
+        process.kill()
+        _, errors = process.communicate()
+        raise RuntimeError(f"{entry}: {e}\n{errors[-2000:]}")
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.communicate(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+    return elapsed
+
+
+def main(entries: list = ENTRIES, runs: int = 5, database: str = "mongo") -> dict:
+    results = {}
+    for entry in entries:
+        imports = [measure_import(entry) for _ in range(runs)]
+        first_requests = [measure_first_request(entry, database) for _ in range(runs)]
+        results[entry] = result = {
+            "import_ms": statistics.median(probe['seconds'] for probe in imports) * 1000,
+            "loaded_at_import": imports[-1]['loaded'],
+            "first_request_ms": statistics.median(first_requests) * 1000,
+        }
+        loaded = ", ".join(result['loaded_at_import']) or "none"
+        print(f"{entry:<7} import {result['import_ms']:6.0f}ms  first request {result['first_request_ms']:6.0f}ms  "
+              f"heavy modules at import: {loaded}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', nargs='+', choices=ENTRIES, default=list(ENTRIES))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--db', choices=['mongo', 'memory'], default='mongo')
+    args = parser.parse_args()
+    main(args.entries, args.runs, args.db)
@@ -0,0 +1,124 @@
+"""LLM calls and throughput of the summarization engine against a fake LLM.
+
+Inserts ``--articles`` pending articles with distinct bodies (a
+``--long-ratio`` share of them long enough for map-reduce, the rest short),
+swaps ``LlmChat`` for a stand-in that answers after ``--latency`` seconds
+(plus ``--latency-per-1k`` per thousand prompt tokens), and summarizes them
+two ways with ``--concurrency`` workers:
+
+* ``per-article``: one generate_summary call per article, and
+* ``batched``: create_summaries over groups of SUMMARY_BATCH_MAX_ARTICLES
+  ids, as a queue worker does with its claimed batch.
+
+Reported per mode are LLM calls per 100 articles and summaries/s.
+``--duplicates`` makes that fraction of articles reuse an earlier body so
+the summary cache is exercised too.
+
+Usage: python -m benchmarks.bench_summarize [--articles N] [--latency S] [--latency-per-1k S]
+       [--concurrency C] [--long-ratio F] [--rate-per-minute R] [--duplicates F] [--db mongo|memory]
+(run from the backend directory; the LLM rate limit is off unless
+``--rate-per-minute`` is given).
+"""
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import FakeLlmChat, Timer, exit_on_failures, install_fake_llm, percentile, synthetic_article, use_memory_database
+
+import server
+
+MODES = ("per-article", "batched")
+
+
+def pending_articles(count: int, duplicates: float, long_ratio: float, rng: random.Random) -> list:
+    articles = []
+    for n in range(count):
+        words = rng.randint(2000, 2600) if rng.random() < long_ratio else rng.randint(150, 600)
+        article = synthetic_article(n, rng, content_words=words, status="pending", url=f"https://bench.nooz.news/summarize/{n}")
+        if articles and rng.random() < duplicates:
+            article['content'] = rng.choice(articles)['content']
+        article['content_hash'] = server.content_fingerprint(article['content'])
+        articles.append(article)
+    return articles
+
+
+async def run_mode(mode: str, articles: list, concurrency: int) -> dict:
+    article_ids = [article['id'] for article in articles]
+    await server.db.articles.insert_many([dict(article) for article in articles])
+    FakeLlmChat.calls = 0
+    if mode == "per-article":
+        units = [[article_id] for article_id in article_ids]
+    else:
+        size = max(1, server.SUMMARY_BATCH_MAX_ARTICLES)
+        units = [article_ids[start:start + size] for start in range(0, len(article_ids), size)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    outcomes = {}
+
+    async def summarize(unit: list):
+        async with semaphore:
+            with Timer() as timer:
+                if mode == "per-article":
+                    outcomes[unit[0]] = await server.generate_summary(unit[0])
+                else:
+                    outcomes.update(await server.create_summaries(unit))
+            latencies.append(timer.elapsed * 1000)
+
+    try:
+        with Timer() as timer:
+            await asyncio.gather(*(summarize(unit) for unit in units))
+    finally:
+        await server.db.articles.delete_many({"id": {"$in": article_ids}})
+        await server.db.summaries.delete_many({"article_id": {"$in": article_ids}})
+        await server.db.summary_cache.delete_many({"fingerprint": {"$in": [article['content_hash'] for article in articles]}})
+
+    summarized = sum(1 for outcome in outcomes.values() if isinstance(outcome, server.Summary))
+    return {
+        "summaries_per_second": summarized / timer.elapsed,
+        "llm_calls": FakeLlmChat.calls,
+        "llm_calls_per_100_articles": FakeLlmChat.calls * 100 / len(articles),
+        "failed": len(articles) - summarized,
+        "unit_p50_ms": percentile(latencies, 50),
+        "unit_p99_ms": percentile(latencies, 99),
+    }
+
+
+async def main(
+    count: int,
+    latency: float,
+    concurrency: int,
+    rate_per_minute: float = 0,
+    duplicates: float = 0.0,
+    long_ratio: float = 0.2,
+    latency_per_1k: float = 0.0,
+) -> dict:
+    install_fake_llm(latency, latency_per_1k)
+    server.llm_rate_limiter = server.SharedRateLimiter("bench-llm", rate_per_minute / 60, server.SUMMARY_RATE_BURST)
+    articles = pending_articles(count, duplicates, long_ratio, random.Random(42))
+
+    results = {}
+    for mode in MODES:
+        results[mode] = result = await run_mode(mode, articles, concurrency)
+        print(f"{mode:<12} {result['summaries_per_second']:7.1f} summaries/s  "
+              f"{result['llm_calls_per_100_articles']:6.1f} LLM calls/100 articles  "
+              f"unit p50 {result['unit_p50_ms']:.0f}ms p99 {result['unit_p99_ms']:.0f}ms  failed {result['failed']}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.5, help="fake LLM base response time in seconds")
+    parser.add_argument('--latency-per-1k', type=float, default=0.05, help="extra fake LLM seconds per 1k prompt tokens")
+    parser.add_argument('--concurrency', type=int, default=server.SUMMARY_WORKERS)
+    parser.add_argument('--long-ratio', type=float, default=0.2, help="fraction of articles long enough for map-reduce")
+    parser.add_argument('--rate-per-minute', type=float, default=0, help="LLM rate limit; 0 disables it")
+    parser.add_argument('--duplicates', type=float, default=0.0, help="fraction of articles repeating an earlier body")
+    parser.add_argument('--db', choices=['mongo', 'memory'], default='mongo')
+    args = parser.parse_args()
+    if args.db == 'memory':
+        use_memory_database()
+    exit_on_failures(asyncio.run(main(
+        args.articles, args.latency, args.concurrency, args.rate_per_minute, args.duplicates, args.long_ratio, args.latency_per_1k
+    )))
@@ -0,0 +1,293 @@
+"""Shared helpers for the offline benchmarks.
+
+Benchmarks import ``server`` directly, so the environment variables it
+requires get harmless defaults here before the first import. DB_NAME is
+always replaced (by BENCH_DB_NAME, default ``nooz_bench``) so a benchmark
+can never write to or drop collections in the application database.
+
+Everything the pipeline normally reaches over the network has a local
+stand-in here: feeds and article pages (``synthetic_feed_routes`` served by
+``StubServer``), the LLM (``install_fake_llm``) and, optionally, MongoDB
+(``use_memory_database``).
+"""
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'nooz_bench')
+os.environ.setdefault('JWT_SECRET', 'bench-secret-not-for-production-use')
+
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+VOCABULARY = (
+    "ai chip apple tesla battery climate carbon crypto bitcoin election senate market inflation "
+    "startup funding model regulation privacy security breach launch rocket solar wind grid "
+    "earnings layoffs merger antitrust court ruling vaccine research quantum robot autonomous"
+).split()
+CATEGORIES = ["AI", "Apple", "Tesla", "Crypto", "Climate", "Politics", "Finance"]
+
+
+class StubServer:
+    """Minimal local HTTP server for benchmarks; no external network needed."""
+
+    def __init__(self, routes):
+        self.app = web.Application()
+        for method, path, handler in routes:
+            self.app.router.add_route(method, path, handler)
+        self.runner = None
+        self.port = None
+
+    async def __aenter__(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def synthetic_words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, k=count))
+
+
+def synthetic_article(n: int, rng: random.Random, content_words: int = 400, **overrides) -> dict:
+    """A stored article document shaped like a scraped one."""
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=n)
+    article = {
+        "id": str(uuid.uuid4()),
+        "title": synthetic_words(rng, 8).capitalize(),
+        "url": f"https://bench.nooz.news/{n}",
+        "source_id": f"source-{n % 50}",
+        "source_name": f"Source {n % 50}",
+        "content": synthetic_words(rng, content_words)[:15000],
+        "excerpt": synthetic_words(rng, 40)[:300],
+        "image_url": f"https://bench.nooz.news/img/{n}.jpg",
+        "status": "published",
+        "categories": rng.sample(CATEGORIES, 2),
+        "tags": [],
+        "read_time_minutes": max(1, content_words // 200),
+        "summary_key_points": [synthetic_words(rng, 10) for _ in range(4)],
+        "created_at": created_at.isoformat(),
+    }
+    article.update(overrides)
+    return article
+
+
+def synthetic_feed_routes(items_per_feed: int, paragraphs: int = 30, seed: int = 42, tail_links: int = 0):
+    """StubServer routes for ``/feeds/{feed}`` RSS and the article pages it links.
+
+    Every feed lists ``items_per_feed`` distinct articles at
+    ``/articles/{feed}/{item}``; pages are generated deterministically from
+    ``seed`` so runs are comparable. ``tail_links`` appends a related-links
+    block of that many links after the article, as comment threads and
+    recommendation widgets do on real pages.
+    """
+    async def handle_feed(request):
+        feed = request.match_info['feed']
+        base = f"http://{request.host}"
+        items = "".join(
+            f"<item><title>Feed {feed} story {i}</title><link>{base}/articles/{feed}/{i}</link>"
+            f"<guid>{feed}-{i}</guid><description>Story {i} from feed {feed}</description>"
+            f"<pubDate>Mon, 01 Jan 2024 {i % 24:02d}:{i % 60:02d}:00 GMT</pubDate></item>"
+            for i in range(items_per_feed)
+        )
+        body = f"<?xml version='1.0'?><rss version='2.0'><channel><title>Feed {feed}</title>{items}</channel></rss>"
+        return web.Response(text=body, content_type='application/rss+xml')
+
+    async def handle_article(request):
+        feed, item = request.match_info['feed'], request.match_info['item']
+        rng = random.Random(f"{seed}-{feed}-{item}")
+        body = "".join(f"<p>{synthetic_words(rng, 40).capitalize()}.</p>" for _ in range(paragraphs))
+        html = (
+            f"<html><head><title>Story {item}</title>"
+            f"<meta property='og:image' content='https://bench.nooz.news/img/{feed}-{item}.jpg'></head>"
+            f"<body><nav>menu</nav><article><h1>Feed {feed} story {item}</h1>{body}</article>"
+            + "".join(f"<div class='related'><a href='/articles/{feed}/{n}'>{synthetic_words(rng, 8)}</a></div>" for n in range(tail_links))
+            + "<footer>footer</footer></body></html>"
+        )
+        return web.Response(text=html, content_type='text/html')
+
+    return [('GET', '/feeds/{feed}', handle_feed), ('GET', '/articles/{feed}/{item}', handle_article)]
+
+
+class FakeUserMessage:
+    """Stand-in for ``UserMessage``, so the real LLM client is never imported."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeLlmChat:
+    """Stand-in for ``LlmChat`` that answers like the real model would, after a delay.
+
+    Replies match the request shape: a ``{"summaries": [...]}`` list for
+    batch prompts, chunk notes for map-reduce parts, and a single summary
+    otherwise. Each reply takes ``latency`` seconds plus
+    ``latency_per_1k_tokens`` per thousand prompt tokens.
+    """
+
+    latency = 0.5
+    latency_per_1k_tokens = 0.0
+    calls = 0
+
+    def __init__(self, api_key=None, session_id=None, system_message=None):
+        self.session_id = session_id
+
+    def with_model(self, provider: str, model: str):
+        return self
+
+    @staticmethod
+    def summary(label: str) -> dict:
+        return {
+            "executive_summary": f"Benchmark summary for {label}.",
+            "key_points": ["Point one", "Point two", "Point three", "Point four"],
+            "analysis": "Synthetic analysis.",
+            "takeaways": ["Takeaway one", "Takeaway two", "Takeaway three"],
+        }
+
+    async def send_message(self, message):
+        FakeLlmChat.calls += 1
+        prompt = message.text
+        await asyncio.sleep(FakeLlmChat.latency + FakeLlmChat.latency_per_1k_tokens * len(prompt) / 4000)
+        labels = re.findall(r"=== Article (A\d+) ===", prompt)
+        if labels:
+            reply = {"summaries": [{"id": label, **FakeLlmChat.summary(label)} for label in labels]}
+        elif re.search(r"This is part \d+ of \d+", prompt):
+            reply = {"key_points": ["Chunk point one", "Chunk point two"], "notes": "Synthetic chunk notes."}
+        else:
+            reply = FakeLlmChat.summary(self.session_id)
+        return "Here is the summary:\n```json\n" + json.dumps(reply) + "\n```"
+
+
+def install_fake_llm(latency: float, latency_per_1k_tokens: float = 0.0):
+    import server
+
+    FakeLlmChat.latency = latency
+    FakeLlmChat.latency_per_1k_tokens = latency_per_1k_tokens
+    FakeLlmChat.calls = 0
+    server.LlmChat = FakeLlmChat
+    server.UserMessage = FakeUserMessage
+
+
+async def delete_articles(query: dict):
+    """Delete the matching articles and the summary jobs their scrape queued."""
+    import server
+
+    article_ids = await server.db.articles.distinct("id", query)
+    await server.db.summary_jobs.delete_many({"article_id": {"$in": article_ids}})
+    await server.db.articles.delete_many(query)
+
+
+def use_memory_database():
+    """Point ``server`` at an in-memory MongoDB stand-in (mongomock-motor).
+
+    Handy when no MongoDB is running; query costs are not comparable with
+    a real server, so compare results only against runs on the same backend.
+    """
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--db memory needs mongomock-motor: pip install mongomock-motor")
+    from mongomock.collection import Collection
+    import server
+
+    # mongomock applies a find_one_and_update projection that drops _id
+    # before the update, which then matches nothing; project afterwards
+    find_one_and_update = Collection.find_one_and_update
+
+    def project_after_update(self, filter, update, projection=None, **kwargs):
+        doc = find_one_and_update(self, filter, update, **kwargs)
+        if doc is None or not projection:
+            return doc
+        if not projection.get('_id', True):
+            doc.pop('_id', None)
+        included = [key for key, value in projection.items() if value and key != '_id']
+        if included:
+            return {key: doc[key] for key in ('_id', *included) if key in doc}
+        return {key: value for key, value in doc.items() if projection.get(key, True)}
+
+    Collection.find_one_and_update = project_after_update
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ['DB_NAME']]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def count_failures(results) -> int:
+    """Sum every ``failed`` count in a benchmark result, however deeply nested."""
+    if not isinstance(results, dict):
+        return 0
+    return sum(
+        value if key == "failed" and isinstance(value, int) else count_failures(value)
+        for key, value in results.items()
+    )
+
+
+def exit_on_failures(results: dict):
+    """Exit non-zero when a benchmark failed part of its work, since its numbers then measure the failures."""
+    failures = count_failures(results)
+    if failures:
+        raise SystemExit(f"{failures} benchmark operations failed; the results are not valid")
+
+
+def write_results(path: Path, results: dict, **metadata) -> Path:
+    """Write ``results`` as JSON alongside the revision and environment they came from."""
+    document = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **metadata,
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, default=str) + "\n")
+    return path
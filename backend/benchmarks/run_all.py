@@ -0,0 +1,76 @@
+"""Run the offline benchmark suite and write the results as JSON.
+
+Runs the scrape, summarize, API, payload and extraction benchmarks with one
+shared set of sizes and writes a single JSON document (revision, environment,
+settings and every benchmark's numbers) to ``--output``, by default
+``benchmarks/results/<revision>.json``, so runs on two commits can be
+diffed directly. No external network is used: feeds and pages come from a
+local stub server and the LLM is faked. If any benchmark reports failed
+work, nothing is written and the run exits non-zero.
+
+Usage: python -m benchmarks.run_all [--db mongo|memory] [--quick] [--only scrape summarize ...]
+       [--output PATH]
+(run from the backend directory; ``--db memory`` needs mongomock-motor).
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from benchmarks import bench_api, bench_extract, bench_payload, bench_scrape, bench_summarize
+from benchmarks.common import BACKEND_DIR, exit_on_failures, git_revision, use_memory_database, write_results
+
+PROFILES = {
+    "full": {
+        "scrape": {"source_count": 20, "items": 25, "rounds": 3},
+        "summarize": {"count": 100, "latency": 0.5, "concurrency": 4},
+        "api": {"sizes": [1000, 10000], "requests": 200, "user_count": 50, "logins": 100, "concurrency": 16},
+        "payload": {"count": 100, "rounds": 200},
+        "extract": {"page_count": 200, "rounds": 3},
+    },
+    "quick": {
+        "scrape": {"source_count": 4, "items": 10, "rounds": 1},
+        "summarize": {"count": 20, "latency": 0.05, "concurrency": 4},
+        "api": {"sizes": [500], "requests": 50, "user_count": 5, "logins": 10, "concurrency": 4},
+        "payload": {"count": 100, "rounds": 20},
+        "extract": {"page_count": 50, "rounds": 1},
+    },
+}
+
+
+BENCHMARKS = {
+    "scrape": bench_scrape.main,
+    "summarize": bench_summarize.main,
+    "api": bench_api.main,
+    "payload": bench_payload.main,
+    "extract": bench_extract.main,
+}
+
+
+async def main(profile: str, only: list, database: str, output: Path) -> dict:
+    # One event loop for the whole run: the Motor client binds to the first
+    # loop that uses it
+    settings = PROFILES[profile]
+    results = {}
+    for name in only:
+        print(f"== {name}")
+        result = BENCHMARKS[name](**settings[name])
+        results[name] = await result if asyncio.iscoroutine(result) else result
+    # Numbers from a run that failed part of its work are not written, so
+    # they can never become a baseline
+    exit_on_failures(results)
+    path = write_results(output, results, profile=profile, database=database, settings={name: settings[name] for name in only})
+    print(f"results written to {path}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', choices=['mongo', 'memory'], default='mongo')
+    parser.add_argument('--quick', action='store_true', help="small sizes for a fast smoke run")
+    parser.add_argument('--only', nargs='+', choices=list(PROFILES['full']), default=list(PROFILES['full']))
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+    if args.db == 'memory':
+        use_memory_database()
+    output = args.output or BACKEND_DIR / 'benchmarks' / 'results' / f"{git_revision()}.json"
+    asyncio.run(main('quick' if args.quick else 'full', args.only, args.db, output))
@@ -0,0 +1,26 @@
+"""Create indexes and seed data, then exit.
+
+Run it once per deploy before starting the new processes, and set
+MIGRATE_ON_STARTUP=false on them so none of them touches indexes at boot.
+Does nothing if the database already matches this build; ``--force``
+runs the step anyway.
+
+Usage: python migrate.py [--force] (from the backend directory)
+"""
+import argparse
+import asyncio
+
+import server
+
+
+async def main(force: bool):
+    if not await server.run_migrations(force=force):
+        server.logger.info(f"Schema already at {server.schema_fingerprint()}")
+    server.client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--force', action='store_true', help="run the step even if the database is up to date")
+    args = parser.parse_args()
+    asyncio.run(main(args.force))
@@ -1,22 +1,86 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import sys
+import codecs
+import importlib.util
+import json
+import orjson
+import gzip
+import hmac
+import io
+import cProfile
+import pstats
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Union
 import uuid
+import hashlib
+import base64
+import heapq
+import itertools
+from collections import Counter, OrderedDict, deque
+import random
+import socket
+import time
 from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
 import bcrypt
 import jwt
-import feedparser
-import aiohttp
-from bs4 import BeautifulSoup
 import asyncio
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import re
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; responses fall back to gzip
+    brotli = None
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument is optional; profiles fall back to cProfile
+    pyinstrument = None
+
+
+def lazy_import(name: str):
+    """Return module ``name``, executing it on first attribute access instead of now.
+
+    The scraping and parsing libraries cost a large share of startup and
+    API-only processes never touch them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+feedparser = lazy_import('feedparser')
+aiohttp = lazy_import('aiohttp')
+etree = lazy_import('lxml.etree')
+lxml_html = lazy_import('lxml.html')
+lxml_cssselect = lazy_import('lxml.cssselect')
+cssselect = lazy_import('cssselect')
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -31,8 +95,107 @@ JWT_SECRET = os.environ.get('JWT_SECRET')
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRE_MINUTES = int(os.environ.get('JWT_EXPIRE_MINUTES', 10080))
 
+# Auth configuration
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', 16))
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_USER_CACHE_TTL = float(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_VERSION_POLL = float(os.environ.get('AUTH_USER_CACHE_VERSION_POLL', 2))
+
+# HTTP client configuration
+HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.environ.get('HTTP_MAX_CONNECTIONS_PER_HOST', 8))
+HTTP_DNS_CACHE_TTL = int(os.environ.get('HTTP_DNS_CACHE_TTL', 300))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', 30))
+HTTP_USER_AGENT = os.environ.get('HTTP_USER_AGENT', 'NOOZ.NEWS/1.0 (+https://nooz.news)')
+
+# Scrape engine configuration
+SCRAPE_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', 16))
+SCRAPE_HOST_CONCURRENCY = int(os.environ.get('SCRAPE_HOST_CONCURRENCY', 4))
+SCRAPE_SOURCE_CONCURRENCY = int(os.environ.get('SCRAPE_SOURCE_CONCURRENCY', max(1, SCRAPE_CONCURRENCY // SCRAPE_HOST_CONCURRENCY)))
+SCRAPE_SOURCE_TIMEOUT = float(os.environ.get('SCRAPE_SOURCE_TIMEOUT', 120))
+SCRAPE_SOURCE_BUDGET = int(os.environ.get('SCRAPE_SOURCE_BUDGET', 50))
+SCRAPE_SEEN_GUIDS = int(os.environ.get('SCRAPE_SEEN_GUIDS', 1000))
+SCRAPE_BACKLOG_DELAY_SECONDS = float(os.environ.get('SCRAPE_BACKLOG_DELAY_SECONDS', 60))
+SCRAPE_BACKOFF_MAX_MULTIPLIER = int(os.environ.get('SCRAPE_BACKOFF_MAX_MULTIPLIER', 16))
+SCRAPE_LEASE_SECONDS = float(os.environ.get('SCRAPE_LEASE_SECONDS', 60))
+SCRAPE_FLUSH_SIZE = int(os.environ.get('SCRAPE_FLUSH_SIZE', 10))
+SCRAPE_ENTRY_MAX_ATTEMPTS = int(os.environ.get('SCRAPE_ENTRY_MAX_ATTEMPTS', 3))
+
+# Host health configuration
+HOST_HEALTH_WINDOW = int(os.environ.get('HOST_HEALTH_WINDOW', 20))
+HOST_LATENCY_EWMA_ALPHA = float(os.environ.get('HOST_LATENCY_EWMA_ALPHA', 0.3))
+HOST_CIRCUIT_MIN_REQUESTS = int(os.environ.get('HOST_CIRCUIT_MIN_REQUESTS', 5))
+HOST_CIRCUIT_FAILURE_RATE = float(os.environ.get('HOST_CIRCUIT_FAILURE_RATE', 0.5))
+HOST_CIRCUIT_OPEN_SECONDS = float(os.environ.get('HOST_CIRCUIT_OPEN_SECONDS', 60))
+HOST_CIRCUIT_MAX_OPEN_SECONDS = float(os.environ.get('HOST_CIRCUIT_MAX_OPEN_SECONDS', 3600))
+HOST_CIRCUIT_PROBE_SECONDS = float(os.environ.get('HOST_CIRCUIT_PROBE_SECONDS', 30))
+
+# Extraction configuration
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS', min(4, os.cpu_count() or 1)))
+EXTRACT_CPU_BUDGET_SECONDS = float(os.environ.get('EXTRACT_CPU_BUDGET_SECONDS', 5))
+EXTRACT_MIN_CONTENT_CHARS = int(os.environ.get('EXTRACT_MIN_CONTENT_CHARS', 200))
+
+# Page download configuration
+PAGE_MAX_BYTES = int(os.environ.get('PAGE_MAX_BYTES', 2 * 1024 * 1024))
+PAGE_CHUNK_BYTES = int(os.environ.get('PAGE_CHUNK_BYTES', 64 * 1024))
+PAGE_EARLY_STOP = os.environ.get('PAGE_EARLY_STOP', 'false').lower() == 'true'
+PAGE_DRAIN_MAX_BYTES = int(os.environ.get('PAGE_DRAIN_MAX_BYTES', 256 * 1024))
+
+# Scrape job configuration
+SCRAPE_JOB_RETENTION = int(os.environ.get('SCRAPE_JOB_RETENTION', 100))
+SCRAPE_JOB_TTL = float(os.environ.get('SCRAPE_JOB_TTL', 3600))
+SCRAPE_STREAM_KEEPALIVE = float(os.environ.get('SCRAPE_STREAM_KEEPALIVE', 15))
+
+# Analytics configuration
+ANALYTICS_FLUSH_SIZE = int(os.environ.get('ANALYTICS_FLUSH_SIZE', 500))
+ANALYTICS_FLUSH_INTERVAL = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 5))
+
+# Scheduler configuration
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
+SCHEDULER_JITTER_SECONDS = float(os.environ.get('SCHEDULER_JITTER_SECONDS', 120))
+SCHEDULER_SYNC_SECONDS = float(os.environ.get('SCHEDULER_SYNC_SECONDS', 60))
+
+# Summary job queue configuration
+SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', 4))
+# LLM requests per minute across every process sharing the database
+SUMMARY_RATE_PER_MINUTE = float(os.environ.get('SUMMARY_RATE_PER_MINUTE', 30))
+SUMMARY_RATE_BURST = int(os.environ.get('SUMMARY_RATE_BURST', 5))
+SUMMARY_MAX_ATTEMPTS = int(os.environ.get('SUMMARY_MAX_ATTEMPTS', 5))
+SUMMARY_RETRY_BASE_SECONDS = float(os.environ.get('SUMMARY_RETRY_BASE_SECONDS', 30))
+SUMMARY_RETRY_MAX_SECONDS = float(os.environ.get('SUMMARY_RETRY_MAX_SECONDS', 3600))
+SUMMARY_JOB_LEASE_SECONDS = float(os.environ.get('SUMMARY_JOB_LEASE_SECONDS', 60))
+SUMMARY_POLL_SECONDS = float(os.environ.get('SUMMARY_POLL_SECONDS', 5))
+SUMMARY_CACHE_MIN_WORDS = int(os.environ.get('SUMMARY_CACHE_MIN_WORDS', 80))
+SUMMARY_BATCH_MAX_ARTICLES = int(os.environ.get('SUMMARY_BATCH_MAX_ARTICLES', 8))
+SUMMARY_BATCH_ARTICLE_TOKENS = int(os.environ.get('SUMMARY_BATCH_ARTICLE_TOKENS', 1000))
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.environ.get('SUMMARY_BATCH_TOKEN_BUDGET', 6000))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', 2500))
+
+# Migration configuration
+MIGRATE_ON_STARTUP = os.environ.get('MIGRATE_ON_STARTUP', 'true').lower() == 'true'
+MIGRATION_LOCK_SECONDS = float(os.environ.get('MIGRATION_LOCK_SECONDS', 300))
+
+# Response cache configuration
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))
+RESPONSE_CACHE_VERSION_POLL = float(os.environ.get('RESPONSE_CACHE_VERSION_POLL', 2))
+
+# Category timeline configuration
+TIMELINE_SIZE = int(os.environ.get('TIMELINE_SIZE', 200))
+
+# Response compression configuration
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+
+# Request profiling configuration
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'false').lower() == 'true'
+REQUEST_PROFILING_TOKEN = os.environ.get('REQUEST_PROFILING_TOKEN')
+REQUEST_PROFILING_INTERVAL = float(os.environ.get('REQUEST_PROFILING_INTERVAL', 0.001))
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
@@ -43,6 +206,34 @@ logger = logging.getLogger(__name__)
 
 # ===================== MODELS =====================
 
+class ExtractionRules(BaseModel):
+    """Per-source CSS selectors tried before the generic extractors."""
+    content_selectors: List[str] = []
+    drop_selectors: List[str] = []
+    image_selectors: List[str] = []
+
+    @field_validator('content_selectors', 'drop_selectors', 'image_selectors')
+    @classmethod
+    def check_selectors(cls, selectors: List[str]) -> List[str]:
+        for selector in selectors:
+            try:
+                compile_selector(selector)
+            except cssselect.SelectorError as e:
+                raise ValueError(f"Invalid CSS selector {selector!r}: {e}")
+        return selectors
+
+
+class SourceHealth(BaseModel):
+    status: str = "healthy"
+    consecutive_failures: int = 0
+    failure_rate: float = 0.0
+    latency_ewma_ms: Optional[float] = None
+    circuit_open_until: Optional[str] = None
+    last_error: Optional[str] = None
+    last_success_at: Optional[str] = None
+    checked_at: Optional[str] = None
+
+
 class Source(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -55,6 +246,11 @@ class Source(BaseModel):
     scrape_interval_minutes: int = 60
     last_scrape: Optional[str] = None
     categories: List[str] = []
+    feed_etag: Optional[str] = None
+    feed_last_modified: Optional[str] = None
+    feed_hash: Optional[str] = None
+    extraction_rules: Optional[ExtractionRules] = None
+    health: Optional[SourceHealth] = None
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 
@@ -67,6 +263,7 @@ class SourceCreate(BaseModel):
     is_active: bool = True
     scrape_interval_minutes: int = 60
     categories: List[str] = []
+    extraction_rules: Optional[ExtractionRules] = None
 
 
 class SourceUpdate(BaseModel):
@@ -78,6 +275,7 @@ class SourceUpdate(BaseModel):
     is_active: Optional[bool] = None
     scrape_interval_minutes: Optional[int] = None
     categories: Optional[List[str]] = None
+    extraction_rules: Optional[ExtractionRules] = None
 
 
 class Article(BaseModel):
@@ -96,6 +294,9 @@ class Article(BaseModel):
     categories: List[str] = []
     tags: List[str] = []
     read_time_minutes: Optional[int] = None
+    content_hash: Optional[str] = None
+    extractor: Optional[str] = None
+    summary_key_points: List[str] = []
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 
@@ -126,318 +327,3095 @@ class UserRegister(BaseModel):
     display_name: Optional[str] = None
 
 
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class UserRoleUpdate(BaseModel):
+    role: str
+
+
+class Bookmark(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    article_id: str
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class AnalyticsEvent(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    event_type: str
+    article_id: Optional[str] = None
+    user_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = {}
+    timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class ScrapeRequest(BaseModel):
+    category: Optional[str] = None
+    background: bool = False
+
+
+class ScrapeResult(BaseModel):
+    source_name: str
+    articles_found: int
+    articles_added: int
+    articles_deferred: int = 0
+    articles_failed: int = 0
+    page_bytes_fetched: int = 0
+    page_bytes_used: int = 0
+    article_ids: List[str] = []
+    status: str
+
+
+# ===================== CACHING =====================
+
+class LRUTTLCache:
+    """Bounded LRU mapping whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is not None and item[0] > time.monotonic():
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+        if item is not None:
+            del self._data[key]
+            self.evictions += 1
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SharedVersion:
+    """A counter in ``db.counters`` that any process bumps to invalidate caches.
+
+    ``get`` re-reads it at most every ``poll_seconds``, so a bump made by
+    another process is seen within that time; this process's own bumps are
+    seen at once.
+    """
+
+    def __init__(self, name: str, poll_seconds: float):
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self.value = 0
+        self.checked_at = 0.0
+
+    async def get(self) -> int:
+        now = time.monotonic()
+        if now - self.checked_at >= self.poll_seconds:
+            doc = await db.counters.find_one({"_id": self.name})
+            self.value = doc['value'] if doc else 0
+            self.checked_at = now
+        return self.value
+
+    async def bump(self):
+        doc = await db.counters.find_one_and_update(
+            {"_id": self.name}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self.value = doc['value']
+        self.checked_at = time.monotonic()
+
+
+# ===================== METRICS =====================
+
+# Process-local; every worker process exposes its own /api/metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class CounterMetric:
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class HistogramMetric:
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts, sum, count]
+        self.values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(self.labels + ('le',), key + (f'{bound:g}',))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labels + ('le',), key + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> CounterMetric:
+        metric = CounterMetric(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: tuple = ()) -> HistogramMetric:
+        metric = HistogramMetric(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "nooz_pipeline_stage_seconds", "Time spent in each scrape/summarize pipeline stage.", ("stage", "source", "outcome")
+)
+scrape_sources_total = metrics.counter("nooz_scrape_sources_total", "Source scrapes by result.", ("source", "outcome"))
+scrape_articles_total = metrics.counter(
+    "nooz_scrape_articles_total", "Feed entries by what the scrape did with them.", ("source", "outcome")
+)
+extractions_total = metrics.counter("nooz_extractions_total", "Article pages by the extractor that produced the text.", ("source", "extractor"))
+page_bytes_total = metrics.counter(
+    "nooz_page_bytes_total", "Article page bytes downloaded, and kept as article text.", ("source", "kind")
+)
+host_circuit_trips_total = metrics.counter("nooz_host_circuit_trips_total", "Times a publisher host's circuit opened.", ("host", "reason"))
+llm_requests_total = metrics.counter("nooz_llm_requests_total", "LLM requests by summarization mode.", ("mode",))
+summaries_total = metrics.counter("nooz_summaries_total", "Summaries by how they were produced.", ("outcome",))
+http_requests_total = metrics.counter("nooz_http_requests_total", "API requests served.", ("method", "route", "status"))
+http_request_seconds = metrics.histogram("nooz_http_request_seconds", "API request latency.", ("method", "route"))
+
+
+class track_stage:
+    """Time a pipeline stage into ``nooz_pipeline_stage_seconds``.
+
+    The outcome is ``ok`` unless the caller sets ``.outcome`` or the block
+    raises (``error``, or ``cancelled`` for cancellation and timeouts).
+    """
+
+    def __init__(self, stage: str, source: str = ""):
+        self.stage = stage
+        self.source = source
+        self.outcome = "ok"
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.outcome = "cancelled" if issubclass(exc_type, asyncio.CancelledError) else "error"
+        stage_seconds.observe(time.perf_counter() - self.start, stage=self.stage, source=self.source, outcome=self.outcome)
+        return False
+
+
+class MetricsMiddleware:
+    """Count and time every HTTP request by method, route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths
+            # share one label so probes for random URLs cannot grow the series
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or "unmatched"
+            http_requests_total.inc(method=scope['method'], route=path, status=status_code)
+            http_request_seconds.observe(time.perf_counter() - start, method=scope['method'], route=path)
+
+
+# ===================== AUTH HELPERS =====================
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_semaphore = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+
+
+async def run_password_op(func, *args):
+    """Run hash_password/verify_password off the event loop.
+
+    bcrypt releases the GIL while hashing, so a small thread pool gives real
+    parallelism; the semaphore caps how many hashes can be queued at once.
+    """
+    async with password_semaphore:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+
+
+# Decoded token subject -> (users version, user document without password
+# hash). Any process that changes a user bumps the shared users version,
+# which drops every process's cached users within AUTH_USER_CACHE_VERSION_POLL
+user_cache = LRUTTLCache(AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL)
+users_version = SharedVersion("users_version", AUTH_USER_CACHE_VERSION_POLL)
+
+
+async def invalidate_cached_user(user_id: str):
+    user_cache.pop(user_id)
+    await users_version.bump()
+
+
+def create_access_token(data: dict) -> str:
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + timedelta(minutes=JWT_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return encoded_jwt
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    try:
+        token = credentials.credentials
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        # Read the version first, so a user loaded after a bump is never
+        # stored under the version from before it
+        version = await users_version.get()
+        cached_version, user = user_cache.get(user_id, (None, None))
+        if user is None or cached_version != version:
+            user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found")
+            user_cache.set(user_id, (version, user))
+        return dict(user)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[dict]:
+    if credentials is None:
+        return None
+    try:
+        return await get_current_user(credentials)
+    except:
+        return None
+
+
+# ===================== HTTP CLIENT =====================
+
+http_session: Optional["aiohttp.ClientSession"] = None
+
+
+async def get_http_session() -> "aiohttp.ClientSession":
+    """Return the shared scraper session, creating it on first use.
+
+    One pooled session keeps connections alive between feed and article
+    requests and caches DNS lookups, instead of paying for a new connector
+    and TLS handshake on every fetch.
+    """
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        http_session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": HTTP_USER_AGENT},
+        )
+    return http_session
+
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+
+# ===================== HOST HEALTH =====================
+
+class HostCircuitOpen(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, open_until: float):
+        super().__init__(f"circuit open for {host} until {datetime.fromtimestamp(open_until, timezone.utc).isoformat()}")
+        self.host = host
+        self.open_until = open_until
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBreaker:
+    """Failure rate, latency EWMA and circuit state for one publisher host.
+
+    Connection errors, timeouts, 429s and 5xx responses count as failures.
+    The circuit opens once the failure rate over the last HOST_HEALTH_WINDOW
+    requests reaches HOST_CIRCUIT_FAILURE_RATE, or for as long as a 429/503
+    asks via Retry-After. Each consecutive trip doubles the open time. When
+    it expires one probe request is let through per HOST_CIRCUIT_PROBE_SECONDS;
+    a success closes the circuit and a failure opens it again.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.outcomes = deque(maxlen=HOST_HEALTH_WINDOW)
+        self.latency_ewma: Optional[float] = None
+        self.open_until = 0.0
+        self.trips = 0
+        self.half_open = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def failure_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def blocked(self) -> bool:
+        return time.time() < self.open_until
+
+    def allow(self):
+        """Raise HostCircuitOpen unless a request may be sent now."""
+        now = time.time()
+        if now < self.open_until:
+            raise HostCircuitOpen(self.host, self.open_until)
+        if self.trips:
+            # Half-open: this request is the probe, others wait for its result
+            self.half_open = True
+            self.open_until = now + HOST_CIRCUIT_PROBE_SECONDS
+
+    def trip(self, reason: str, duration: Optional[float] = None):
+        self.trips += 1
+        if duration is None:
+            duration = HOST_CIRCUIT_OPEN_SECONDS * 2 ** (self.trips - 1)
+        duration = min(duration, HOST_CIRCUIT_MAX_OPEN_SECONDS)
+        self.open_until = time.time() + duration
+        self.half_open = False
+        host_circuit_trips_total.inc(host=self.host, reason=reason)
+        logger.warning(f"Circuit for {self.host} open for {duration:.0f}s ({reason}, failure rate {self.failure_rate:.0%})")
+
+    def record(self, status: Optional[int], elapsed: float, retry_after: Optional[str] = None, error: Optional[str] = None):
+        """Record one request; ``status`` is None when it failed without a response."""
+        failed = status is None or status == 429 or status >= 500
+        self.latency_ewma = elapsed if self.latency_ewma is None else (
+            HOST_LATENCY_EWMA_ALPHA * elapsed + (1 - HOST_LATENCY_EWMA_ALPHA) * self.latency_ewma
+        )
+        self.outcomes.append(failed)
+        if failed:
+            self.last_error = error or f"HTTP {status}"
+        
+        # Requests already in flight when the circuit opened do not trip it again
+        delay = parse_retry_after(retry_after) if status in (429, 503) else None
+        if delay and time.time() + delay > self.open_until:
+            self.trip("retry_after", delay)
+        elif failed and (self.half_open or (
+            not self.blocked
+            and len(self.outcomes) >= HOST_CIRCUIT_MIN_REQUESTS
+            and self.failure_rate >= HOST_CIRCUIT_FAILURE_RATE
+        )):
+            self.trip("probe_failed" if self.half_open else "failure_rate")
+        elif not failed and self.half_open:
+            logger.info(f"Circuit for {self.host} closed after a successful probe")
+            self.outcomes.clear()
+            self.open_until = 0.0
+            self.trips = 0
+            self.half_open = False
+
+    @asynccontextmanager
+    async def request(self, session: "aiohttp.ClientSession", url: str, **kwargs):
+        """``session.get`` guarded by the circuit, recording the outcome.
+
+        Errors raised by the caller's own block while reading a response that
+        arrived are not held against the host.
+        """
+        self.allow()
+        start = time.monotonic()
+        status, retry_after, error = None, None, None
+        try:
+            async with session.get(url, **kwargs) as response:
+                status, retry_after = response.status, response.headers.get('Retry-After')
+                yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, error = None, f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if status is not None or error is not None:
+                self.record(status, time.monotonic() - start, retry_after, error)
+
+    def snapshot(self) -> dict:
+        return {
+            "host": self.host,
+            "state": "open" if self.blocked and not self.half_open else "half_open" if self.half_open else "closed",
+            "failure_rate": round(self.failure_rate, 3),
+            "requests": len(self.outcomes),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "open_until": datetime.fromtimestamp(self.open_until, timezone.utc).isoformat() if self.blocked else None,
+            "trips": self.trips,
+            "last_error": self.last_error,
+        }
+
+
+host_breakers: Dict[str, HostBreaker] = {}
+
+
+def host_breaker(url: str) -> HostBreaker:
+    host = urlparse(url).netloc.lower()
+    breaker = host_breakers.get(host)
+    if breaker is None:
+        breaker = host_breakers[host] = HostBreaker(host)
+    return breaker
+
+
+# ===================== RSS SCRAPER =====================
+
+async def fetch_rss_feed(url: str, source: Optional[dict] = None) -> Optional[Dict]:
+    """Download and parse a feed.
+
+    When ``source`` is given, its stored ``feed_etag``/``feed_last_modified``
+    are sent as a conditional GET. A 304, or a body whose hash matches
+    ``feed_hash``, skips parsing and returns an empty feed flagged
+    ``not_modified``. The fresh validators are returned under ``validators``
+    for the caller to persist once the feed has been processed.
+    """
+    headers = {}
+    if source:
+        if source.get('feed_etag'):
+            headers['If-None-Match'] = source['feed_etag']
+        if source.get('feed_last_modified'):
+            headers['If-Modified-Since'] = source['feed_last_modified']
+    source_name = source['name'] if source else ""
+    try:
+        session = await get_http_session()
+        with track_stage("fetch", source_name) as stage:
+            async with host_breaker(url).request(session, url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 304:
+                    stage.outcome = "not_modified"
+                    return feedparser.FeedParserDict(entries=[], not_modified=True, validators={})
+                if response.status != 200:
+                    stage.outcome = "http_error"
+                    return None
+                content = await response.read()
+                validators = {
+                    "feed_etag": response.headers.get('ETag'),
+                    "feed_last_modified": response.headers.get('Last-Modified'),
+                    "feed_hash": hashlib.sha256(content).hexdigest(),
+                }
+                if source and validators['feed_hash'] == source.get('feed_hash'):
+                    stage.outcome = "unchanged"
+                    return feedparser.FeedParserDict(entries=[], not_modified=True, validators=validators)
+        with track_stage("parse", source_name):
+            feed = feedparser.parse(content)
+        feed['validators'] = validators
+        return feed
+    except HostCircuitOpen:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching RSS feed {url}: {e}")
+    return None
+
+
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+BYTE_ORDER_MARKS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-z0-9_.:+-]+)', re.I)
+ARTICLE_TAG = re.compile(rb'<(/?)(?:article|main)\b[^>]*>', re.I)
+
+
+class ArticleEndScanner:
+    """Find where the first outermost article or main element closes in a growing page.
+
+    Nested elements (comment or related-story cards inside the story) are
+    counted, so the end is that of the element they sit in.
+    """
+
+    def __init__(self):
+        self.position = 0
+        self.depth = 0
+
+    def scan(self, body: bytearray) -> Optional[int]:
+        for match in ARTICLE_TAG.finditer(body, self.position):
+            self.position = match.end()
+            if not match.group(1):
+                self.depth += 1
+            elif self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return match.end()
+        # Resume at a tag the chunk boundary cut in two
+        tail = body.rfind(b"<", self.position)
+        self.position = tail if tail != -1 and body.find(b">", tail) == -1 else len(body)
+        return None
+
+
+def sniff_charset(header_charset: Optional[str], head: bytes) -> str:
+    """A page's encoding: byte-order mark, then Content-Type charset, then a <meta> in the first 1024 bytes, else UTF-8."""
+    for mark, encoding in BYTE_ORDER_MARKS:
+        if head.startswith(mark):
+            return encoding
+    match = META_CHARSET.search(head, 0, 1024)
+    for candidate in (header_charset, match.group(1).decode('ascii') if match else None):
+        if not candidate:
+            continue
+        try:
+            codecs.lookup(candidate)
+        except LookupError:
+            continue
+        return candidate.lower()
+    return "utf-8"
+
+
+async def read_page(response, stop_early: bool) -> tuple[Optional[bytes], Optional[str], int, str]:
+    """Stream an HTML body in chunks; returns ``(html, encoding, bytes_read, outcome)``.
+
+    Reading stops at PAGE_MAX_BYTES, and with ``stop_early`` once the first
+    outermost article or main element has closed: ``html`` is cut there so
+    only that much is parsed. That is only safe for pages whose first such
+    element is the story, since the extractors otherwise compare every
+    article element or score the whole page, so it is opt-in
+    (PAGE_EARLY_STOP). Abandoning a response costs its kept-alive connection,
+    so a response declaring at most PAGE_DRAIN_MAX_BYTES is still read to
+    the end. ``html`` is None for bodies that are not HTML.
+    """
+    if 'Content-Type' in response.headers and response.content_type not in HTML_CONTENT_TYPES:
+        return None, None, 0, "not_html"
+    body = bytearray()
+    cut = None
+    outcome = "ok"
+    scanner = ArticleEndScanner()
+    async for chunk in response.content.iter_chunked(PAGE_CHUNK_BYTES):
+        scanned = len(body)
+        body += chunk
+        if not scanned and b"\0" in body[:1024] and not body.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            # Mislabeled binary: images, PDFs, archives
+            return None, None, len(body), "not_html"
+        if len(body) >= PAGE_MAX_BYTES:
+            if cut is None:
+                cut, outcome = PAGE_MAX_BYTES, "truncated"
+            break
+        if stop_early and cut is None:
+            cut = scanner.scan(body)
+            if cut is not None:
+                outcome = "early_stop"
+                if response.content_length is None or response.content_length > PAGE_DRAIN_MAX_BYTES:
+                    break
+    html = bytes(body[:cut]) if cut is not None else bytes(body)
+    return html, sniff_charset(response.charset, html[:1024]), len(body), outcome
+
+
+async def extract_article_content(
+    url: str, source_name: str = "", rules: Optional[dict] = None, page_bytes: Optional[Counter] = None
+) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Fetch a page and return ``(content, excerpt, image_url, extractor)``.
+
+    Bytes downloaded and bytes kept as article text are added to
+    ``page_bytes`` (as ``fetched`` and ``used``) when given. Raises
+    HostCircuitOpen without fetching when the publisher's circuit is open.
+    A scrape slot is held for the download only.
+    """
+    breaker = host_breaker(url)
+    if breaker.blocked:
+        raise HostCircuitOpen(breaker.host, breaker.open_until)
+    rules = rules or {}
+    # Source rules may point past the first article element
+    stop_early = PAGE_EARLY_STOP and not rules.get('content_selectors') and not rules.get('image_selectors')
+    try:
+        session = await get_http_session()
+        async with scrape_slot(url):
+            with track_stage("fetch_page", source_name) as stage:
+                async with breaker.request(session, url, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                    if response.status != 200:
+                        stage.outcome = "http_error"
+                        return None, None, None, None
+                    html, encoding, fetched, stage.outcome = await read_page(response, stop_early)
+        page_bytes_total.inc(fetched, source=source_name, kind="fetched")
+        if page_bytes is not None:
+            page_bytes['fetched'] += fetched
+        if html is None:
+            return None, None, None, None
+        with track_stage("extract", source_name):
+            result = await parse_article_off_loop(html, url, rules, encoding)
+        extractions_total.inc(source=source_name, extractor=result[3] or "none")
+        used = len(result[0].encode('utf-8')) if result[0] else 0
+        page_bytes_total.inc(used, source=source_name, kind="used")
+        if page_bytes is not None:
+            page_bytes['used'] += used
+        return result
+    except HostCircuitOpen:
+        raise
+    except Exception as e:
+        logger.error(f"Error extracting content from {url}: {e}")
+    return None, None, None, None
+
+
+def entry_published(entry) -> Optional[datetime]:
+    """An entry's publish (or update) time, clamped to now so a future-dated entry cannot block newer ones."""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if not parsed:
+        return None
+    return min(datetime(*parsed[:6], tzinfo=timezone.utc), datetime.now(timezone.utc))
+
+
+def high_water_mark(batch: List[tuple], done_guids: set, newest: Optional[datetime]) -> Optional[datetime]:
+    """The publish time a source's feed is marked read up to after a scrape.
+
+    ``batch`` holds ``(url, (entry, guid, published))`` candidates. The mark
+    is the newest done entry older than every entry not yet done, so nothing
+    still pending falls under it; it stays at ``newest`` when none qualifies.
+    """
+    pending = [published for _, (_, guid, published) in batch if guid not in done_guids]
+    cutoff = min((published for published in pending if published), default=None)
+    return max(
+        (published for _, (_, guid, published) in batch
+         if guid in done_guids and published and (cutoff is None or published < cutoff)),
+        default=newest,
+    )
+
+
+def calculate_read_time(text: str) -> int:
+    words = len(text.split())
+    return max(1, words // 200)
+
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "cmpid", "ncid", "ocid", "smid", "sr_share", "guccounter", "amp", "outputtype",
+}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize an article URL so tracking and AMP variants dedupe to one article.
+
+    Lowercases scheme and host, drops default ports, fragments, ``utm_*`` and
+    other tracking parameters, unwraps ``amp.`` hosts and ``/amp`` path
+    segments, and sorts what is left of the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    if netloc.startswith('amp.'):
+        netloc = netloc[4:]
+    path = re.sub(r'^/amp(?=/)|/amp/?$', '', parts.path) or '/'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def content_fingerprint(text: Optional[str]) -> Optional[str]:
+    """Hash of article text with case, punctuation and whitespace normalized away.
+
+    Returns None for short texts (paywall stubs, teasers) that would otherwise
+    collide across unrelated articles.
+    """
+    if not text:
+        return None
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < SUMMARY_CACHE_MIN_WORDS:
+        return None
+    return hashlib.sha256(' '.join(words).encode('utf-8')).hexdigest()
+
+
+# ===================== EXTRACTORS =====================
+
+# Extractors run inside the extract pool workers. Each takes the parsed page
+# and the source's rules and returns text or None; they are tried in
+# registration order and the first to return at least
+# EXTRACT_MIN_CONTENT_CHARS wins, with "fulltext" as the last resort.
+ARTICLE_EXTRACTORS: List[tuple] = []
+
+BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg", "button")
+GENERIC_CONTENT_SELECTORS = ('article', 'main', '[itemprop="articleBody"]', 'div[class*="content"]')
+META_IMAGE_SELECTORS = ('meta[property="og:image"]', 'meta[name="twitter:image"]', 'meta[property="article:image"]')
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|post|story|text', re.I)
+NEGATIVE_HINTS = re.compile(r'comment|footer|sidebar|related|share|social|promo|sponsor|advert|nav|menu|subscribe|newsletter|cookie', re.I)
+
+@lru_cache(maxsize=32)
+def html_parser(encoding: str = 'utf-8') -> "lxml_html.HTMLParser":
+    """The page parser for one encoding, built on first use so lxml loads lazily.
+
+    Pages arrive as bytes whose encoding read_page already sniffed; lxml
+    decodes them once, with no second guess from a <meta charset>.
+    """
+    return lxml_html.HTMLParser(encoding=encoding)
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(selector: str) -> "lxml_cssselect.CSSSelector":
+    """Compile a CSS selector to XPath once per process."""
+    return lxml_cssselect.CSSSelector(selector, translator='html')
+
+
+def article_extractor(name: str):
+    def register(extractor):
+        ARTICLE_EXTRACTORS.append((name, extractor))
+        return extractor
+    return register
+
+
+def element_text(element) -> str:
+    return '\n'.join(text.strip() for text in element.itertext() if text.strip())
+
+
+def longest_match(doc, selectors) -> Optional[str]:
+    for selector in selectors:
+        texts = [element_text(element) for element in compile_selector(selector)(doc)]
+        if texts:
+            return max(texts, key=len)
+    return None
+
+
+@article_extractor("rules")
+def extract_with_rules(doc, rules: dict) -> Optional[str]:
+    # Every match of the first selector that matches, in document order, so
+    # a selector like "div.paragraph" collects the whole body
+    for selector in rules.get('content_selectors') or []:
+        texts = [element_text(element) for element in compile_selector(selector)(doc)]
+        if texts:
+            return '\n'.join(texts)
+    return None
+
+
+@article_extractor("semantic")
+def extract_semantic(doc, rules: dict) -> Optional[str]:
+    return longest_match(doc, GENERIC_CONTENT_SELECTORS)
+
+
+@article_extractor("readability")
+def extract_by_score(doc, rules: dict) -> Optional[str]:
+    """Readability-style scoring: paragraphs vote for their parent and grandparent."""
+    scores = {}
+    for paragraph in doc.iter('p', 'pre', 'td'):
+        text = paragraph.text_content().strip()
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(',') + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for element, share in ((parent, 1.0), (grandparent, 0.5)):
+            if element is None:
+                continue
+            if element not in scores:
+                hints = f"{element.get('class', '')} {element.get('id', '')}"
+                scores[element] = (25 if POSITIVE_HINTS.search(hints) else 0) - (25 if NEGATIVE_HINTS.search(hints) else 0)
+            scores[element] += points * share
+    if not scores:
+        return None
+    
+    def adjusted(element) -> float:
+        text_length = len(element.text_content()) or 1
+        link_length = sum(len(link.text_content()) for link in element.iter('a'))
+        return scores[element] * (1 - link_length / text_length)
+    
+    return element_text(max(scores, key=adjusted))
+
+
+@article_extractor("fulltext")
+def extract_full_text(doc, rules: dict) -> Optional[str]:
+    body = doc.find('body')
+    return element_text(body if body is not None else doc)
+
+
+def find_image_url(doc, url: str, rules: dict) -> Optional[str]:
+    for selector in (*(rules.get('image_selectors') or []), *META_IMAGE_SELECTORS):
+        for element in compile_selector(selector)(doc):
+            src = element.get('content') or element.get('src') or element.get('data-src')
+            if src:
+                return urljoin(url, src.strip())
+    
+    # First image inside the article body
+    for img in compile_selector('article img, main img')(doc):
+        if img.get('src'):
+            return urljoin(url, img.get('src').strip())
+    return None
+
+
+def parse_article_html(
+    html: Union[str, bytes], url: str, rules: Optional[dict] = None, encoding: str = 'utf-8'
+) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Extract (content, excerpt, image_url, extractor) from a page. CPU-bound; runs in the extract pool.
+
+    ``html`` is decoded text, or raw bytes in ``encoding``.
+    """
+    rules = rules or {}
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8', 'replace'), 'utf-8'
+    try:
+        parser = html_parser(encoding)
+    except LookupError:
+        # An encoding Python knows but libxml2 does not
+        html, parser = html.decode(encoding, 'replace').encode('utf-8'), html_parser('utf-8')
+    try:
+        doc = lxml_html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None, None, None, None
+    
+    image_url = find_image_url(doc, url, rules)
+    
+    etree.strip_elements(doc, etree.Comment, *BOILERPLATE_TAGS, with_tail=False)
+    for selector in rules.get('drop_selectors') or []:
+        for element in compile_selector(selector)(doc):
+            element.drop_tree()
+    
+    content, extractor = None, None
+    for name, extract in ARTICLE_EXTRACTORS:
+        text = extract(doc, rules)
+        if text and (len(text) >= EXTRACT_MIN_CONTENT_CHARS or name == "fulltext"):
+            content, extractor = text, name
+            break
+    if not content:
+        return None, None, image_url, None
+    
+    # Clean up content
+    lines = [line.strip() for line in content.split('\n') if line.strip()]
+    content = '\n'.join(lines)
+    
+    # Get excerpt (first 300 chars)
+    excerpt = content[:300] + "..." if len(content) > 300 else content
+    
+    return content[:15000], excerpt, image_url, extractor
+
+
+# ===================== EXTRACT POOL =====================
+
+extract_pool: Optional[ProcessPoolExecutor] = None
+
+
+def parse_article_html_with_budget(
+    html: Union[str, bytes], url: str, cpu_budget: float, rules: Optional[dict] = None, encoding: str = 'utf-8'
+):
+    """Process-pool entry point: parse under a CPU-time limit.
+
+    ITIMER_PROF counts this worker's CPU time only, so time spent queued
+    behind other pages does not eat into a page's budget.
+    """
+    if cpu_budget <= 0 or not hasattr(signal, 'setitimer'):
+        return parse_article_html(html, url, rules, encoding)
+    
+    def budget_exceeded(signum, frame):
+        raise TimeoutError(f"HTML parsing exceeded {cpu_budget}s CPU budget")
+    
+    previous = signal.signal(signal.SIGPROF, budget_exceeded)
+    signal.setitimer(signal.ITIMER_PROF, cpu_budget)
+    try:
+        return parse_article_html(html, url, rules, encoding)
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+
+
+def get_extract_pool() -> Optional[ProcessPoolExecutor]:
+    global extract_pool
+    if extract_pool is None and EXTRACT_WORKERS > 0:
+        extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return extract_pool
+
+
+def shutdown_extract_pool():
+    global extract_pool
+    if extract_pool is not None:
+        extract_pool.shutdown(wait=False, cancel_futures=True)
+    extract_pool = None
+
+
+async def parse_article_off_loop(
+    html: Union[str, bytes], url: str, rules: Optional[dict] = None, encoding: str = 'utf-8'
+) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Run parse_article_html in the extract pool so the event loop only does I/O.
+
+    With EXTRACT_WORKERS=0 the page is parsed inline, as before.
+    """
+    pool = get_extract_pool()
+    if pool is None:
+        return parse_article_html(html, url, rules, encoding)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            pool, parse_article_html_with_budget, html, url, EXTRACT_CPU_BUDGET_SECONDS, rules, encoding
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge page); start a fresh pool next time
+        shutdown_extract_pool()
+        raise
+
+
+# ===================== LEASES =====================
+
+# Work that several processes or nodes may pick up is claimed with a lease
+# kept on the document itself: an owner, an expiry that heartbeats push
+# forward while the work runs, and a token incremented on every claim.
+# Writes that complete the work are conditioned on the token, so a holder
+# that stalled past its expiry and was taken over cannot overwrite the work
+# of the process that took over.
+
+class LeaseLost(Exception):
+    """The lease expired and was claimed by another worker."""
+
+
+def lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseHeartbeat:
+    """Extend the leases matching ``held`` every third of ``seconds`` while the block runs."""
+
+    def __init__(self, collection, held: dict, expires_field: str, seconds: float):
+        self.collection = collection
+        self.held = held
+        self.expires_field = expires_field
+        self.seconds = seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def _beat(self):
+        while True:
+            await asyncio.sleep(self.seconds / 3)
+            try:
+                await self.collection.update_many(self.held, {"$set": {self.expires_field: utc_iso(self.seconds)}})
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._beat())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return False
+
+
+async def acquire_source_lease(source: dict, if_unchanged: bool = False) -> Optional[int]:
+    """Claim a source for scraping and return the lease token, or None if it is taken.
+
+    With ``if_unchanged`` the claim also fails when anyone has claimed or
+    released the source since ``source`` was loaded, i.e. another process
+    scraped it in the meantime.
+    """
+    now = utc_iso()
+    query = {"id": source['id'], "$or": [{"scrape_lease": {"$exists": False}}, {"scrape_lease.expires_at": {"$lte": now}}]}
+    if if_unchanged:
+        query["scrape_lease.token"] = (source.get('scrape_lease') or {}).get('token')
+    doc = await db.sources.find_one_and_update(
+        query,
+        {
+            "$set": {"scrape_lease.owner": lease_owner(), "scrape_lease.expires_at": utc_iso(SCRAPE_LEASE_SECONDS)},
+            "$inc": {"scrape_lease.token": 1},
+        },
+        projection={"_id": 0, "scrape_lease": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc['scrape_lease']['token'] if doc else None
+
+
+async def release_source_lease(source_id: str, token: int):
+    # Releasing bumps the token too, so a scheduler that loaded the source
+    # before this scrape finished cannot claim it again straight away
+    now = utc_iso()
+    await db.sources.update_one(
+        {"id": source_id, "scrape_lease.token": token},
+        {"$set": {"scrape_lease.expires_at": now, "scrape_lease.finished_at": now}, "$inc": {"scrape_lease.token": 1}},
+    )
+
+
+# ===================== SCRAPE ENGINE =====================
+
+scrape_semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+host_semaphores: Dict[str, asyncio.Semaphore] = {}
+# Sources in progress. SCRAPE_SOURCE_TIMEOUT only starts once a source is
+# admitted here, so sources queued behind a large batch do not time out
+# waiting for fetch slots they never got
+source_semaphore = asyncio.Semaphore(SCRAPE_SOURCE_CONCURRENCY)
+
+
+@asynccontextmanager
+async def scrape_slot(url: str):
+    """Hold one global and one per-host fetch slot for the duration of a request.
+
+    The host slot is taken first so tasks queued behind a slow publisher do
+    not sit on global slots that other hosts could use.
+    """
+    host = urlparse(url).netloc.lower()
+    host_semaphore = host_semaphores.get(host)
+    if host_semaphore is None:
+        host_semaphore = host_semaphores[host] = asyncio.Semaphore(SCRAPE_HOST_CONCURRENCY)
+    async with host_semaphore:
+        async with scrape_semaphore:
+            yield
+
+
+async def build_article(
+    source: dict, entry, article_url: str, page_bytes: Optional[Counter] = None, published: Optional[datetime] = None
+) -> dict:
+    # Extract content and image from article page
+    content, excerpt, scraped_image_url, extractor = await extract_article_content(
+        article_url, source['name'], source.get('extraction_rules'), page_bytes
+    )
+    
+    # Get image - prioritize scraped image, fallback to RSS feed metadata
+    image_url = scraped_image_url
+    if not image_url and hasattr(entry, 'media_content') and entry.media_content:
+        image_url = entry.media_content[0].get('url')
+    if not image_url and hasattr(entry, 'enclosures') and entry.enclosures:
+        image_url = entry.enclosures[0].get('href')
+    
+    return {
+        "id": str(uuid.uuid4()),
+        "title": entry.get('title', 'Untitled'),
+        "url": article_url,
+        "source_id": source['id'],
+        "source_name": source['name'],
+        "content": content,
+        "excerpt": excerpt,
+        "image_url": image_url,
+        "author": entry.get('author', None),
+        "published_at": published.isoformat() if published else None,
+        "status": "pending",
+        "categories": source.get('categories', []),
+        "tags": [],
+        "read_time_minutes": calculate_read_time(content) if content else 5,
+        "content_hash": content_fingerprint(content),
+        "extractor": extractor,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def insert_articles(articles: List[dict]) -> tuple[List[dict], List[dict]]:
+    """Insert articles in one unordered batch; returns ``(written, failed)``.
+
+    Duplicate-key errors mean another scrape stored the same URL first, so
+    those articles are in neither list; ``failed`` holds the ones that hit
+    any other error and are not stored.
+    """
+    if not articles:
+        return [], []
+    with track_stage("insert", articles[0]['source_name']) as stage:
+        try:
+            await db.articles.insert_many(articles, ordered=False)
+            return articles, []
+        except BulkWriteError as e:
+            stage.outcome = "partial"
+            duplicates, errors = set(), set()
+            for error in e.details.get('writeErrors', []):
+                if error.get('code') == 11000:
+                    duplicates.add(error['index'])
+                else:
+                    errors.add(error['index'])
+                    logger.error(f"Error inserting article: {error.get('errmsg')}")
+            written = [article for index, article in enumerate(articles) if index not in duplicates and index not in errors]
+            return written, [articles[index] for index in sorted(errors)]
+
+
+async def scrape_source(
+    source: dict, on_event: Optional[Callable[[str, dict], None]] = None, lease_token: Optional[int] = None,
+    stored: Optional[List[str]] = None,
+) -> ScrapeResult:
+    """Fetch one source's feed and store its new articles.
+
+    ``on_event``, if given, is called with ``("article", {...})`` for each
+    article stored. With ``lease_token`` the results are only written while
+    that scrape lease is still held. ``stored``, if given, is extended with
+    the id of each article as it is stored, so a caller that cancels the
+    scrape still learns what was written.
+    """
+    source_filter = {"id": source['id']}
+    if lease_token is not None:
+        source_filter["scrape_lease.token"] = lease_token
+    feed_breaker = host_breaker(source['rss_url'])
+    if feed_breaker.blocked:
+        return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="circuit_open")
+    try:
+        async with scrape_slot(source['rss_url']):
+            feed = await fetch_rss_feed(source['rss_url'], source)
+        if feed and feed.get('not_modified'):
+            await db.sources.update_one(
+                source_filter,
+                {"$set": {"last_scrape": datetime.now(timezone.utc).isoformat(), **feed['validators']}}
+            )
+            return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="not_modified")
+        if feed is None:
+            return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="fetch_failed")
+        if not feed.entries:
+            return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="no_entries")
+        
+        articles_found = len(feed.entries)
+        
+        # Only entries past the source's high-water mark are new: GUIDs not
+        # seen before and not published before the newest entry processed
+        mark = source.get('feed_high_water') or {}
+        seen_guids = set(mark.get('guids', []))
+        newest = datetime.fromisoformat(mark['published']) if mark.get('published') else None
+        candidates = {}
+        for entry in feed.entries:
+            article_url = canonicalize_url(entry.get('link', '')) if entry.get('link') else ''
+            if not article_url or article_url in candidates:
+                continue
+            guid = entry.get('id') or article_url
+            published = entry_published(entry)
+            if guid in seen_guids or (newest and published and published < newest):
+                continue
+            candidates[article_url] = (entry, guid, published)
+        
+        # Oldest first, so entries left over by the budget are all newer than
+        # the mark this run stores and are picked up next time
+        ordered = sorted(candidates.items(), key=lambda item: (item[1][2] is None, item[1][2].timestamp() if item[1][2] else 0))
+        batch = ordered[:SCRAPE_SOURCE_BUDGET] if SCRAPE_SOURCE_BUDGET > 0 else ordered
+        deferred = len(ordered) - len(batch)
+        
+        # Check the batch URLs against the unique url index in one round trip
+        existing_urls = set()
+        if batch:
+            with track_stage("dedup", source['name']):
+                async for doc in db.articles.find({"url": {"$in": [url for url, _ in batch]}}, {"_id": 0, "url": 1}):
+                    existing_urls.add(doc['url'])
+        
+        page_bytes = Counter()
+        
+        async def process_entry(article_url: str, candidate: tuple) -> tuple[tuple, Optional[dict]]:
+            try:
+                return candidate, await build_article(source, candidate[0], article_url, page_bytes, candidate[2])
+            except HostCircuitOpen:
+                # Left unseen, so the entry is retried once the publisher recovers
+                return candidate, None
+            except Exception as e:
+                logger.error(f"Error processing article {article_url}: {e}")
+                errored.add(candidate[1])
+                return candidate, None
+        
+        # An entry is done once its article is stored, by this run or an
+        # earlier one. Built articles are flushed every SCRAPE_FLUSH_SIZE, so a
+        # run cut short by its timeout keeps what it stored, and the mark only
+        # ever covers done entries: it stops short of the oldest entry still
+        # in flight or failed, which the next run picks up again. An entry
+        # whose build errors in SCRAPE_ENTRY_MAX_ATTEMPTS runs is given up and
+        # counted as done, so it cannot hold the mark and validators back forever
+        done_guids = {guid for url, (_, guid, _) in batch if url in existing_urls}
+        errored = set()
+        given_up = 0
+        unflushed: List[tuple] = []
+        inserted: List[dict] = []
+        insert_failed = 0
+        
+        async def flush(final: bool = False):
+            nonlocal insert_failed, given_up
+            flushing = list(unflushed)
+            unflushed.clear()
+            if lease_token is not None:
+                # Renewing confirms the lease is still ours and leaves a full
+                # lease period for the writes below
+                renewed = await db.sources.update_one(source_filter, {"$set": {"scrape_lease.expires_at": utc_iso(SCRAPE_LEASE_SECONDS)}})
+                if not renewed.matched_count:
+                    raise LeaseLost(f"Scrape lease for {source['name']} was taken over")
+            written, failed_inserts = await insert_articles([article for _, article in flushing])
+            # Queued with the write, so articles stored by a scrape that is
+            # then cancelled or fails are still summarized
+            await enqueue_summaries([article['id'] for article in written])
+            insert_failed += len(failed_inserts)
+            failed_ids = {article['id'] for article in failed_inserts}
+            done_guids.update(candidate[1] for candidate, article in flushing if article['id'] not in failed_ids)
+            inserted.extend(written)
+            if stored is not None:
+                stored.extend(article['id'] for article in written)
+            
+            if final:
+                attempts = {item['guid']: item['attempts'] for item in source.get('feed_entry_failures') or []}
+                batch_guids = {guid for _, (_, guid, _) in batch}
+                # Counts of entries outside this batch (deferred) carry over
+                failures = [{"guid": guid, "attempts": count} for guid, count in attempts.items() if guid not in batch_guids]
+                for guid in errored:
+                    count = attempts.get(guid, 0) + 1
+                    if count >= SCRAPE_ENTRY_MAX_ATTEMPTS:
+                        logger.warning(f"Giving up on entry {guid} of {source['name']} after {count} failed attempts")
+                        done_guids.add(guid)
+                        given_up += 1
+                    else:
+                        failures.append({"guid": guid, "attempts": count})
+            
+            marked = high_water_mark(batch, done_guids, newest)
+            guids = mark.get('guids', []) + [guid for _, (_, guid, _) in batch if guid in done_guids]
+            update = {"feed_high_water": {"guids": guids[-SCRAPE_SEEN_GUIDS:], "published": marked.isoformat() if marked else None}}
+            if final:
+                # Validators are held back while entries are deferred or failed
+                # (open circuit or an error) so the unchanged feed is parsed again
+                update["last_scrape"] = datetime.now(timezone.utc).isoformat()
+                update["feed_entry_failures"] = failures[-SCRAPE_SEEN_GUIDS:]
+                failed = build_failed + insert_failed - given_up
+                if not deferred and not failed:
+                    update.update(feed.get('validators', {}))
+            await db.sources.update_one(source_filter, {"$set": update})
+            
+            if on_event:
+                for article in written:
+                    on_event("article", {
+                        "source_id": source['id'],
+                        "source_name": source['name'],
+                        "article_id": article['id'],
+                        "title": article['title'],
+                        "url": article['url'],
+                    })
+        
+        # One task per entry; the scrape slots bound real parallelism
+        to_build = [(url, candidate) for url, candidate in batch if url not in existing_urls]
+        tasks = [asyncio.create_task(process_entry(url, candidate)) for url, candidate in to_build]
+        build_failed = 0
+        collected = set()
+        try:
+            for next_built in asyncio.as_completed(tasks):
+                candidate, article = await next_built
+                collected.add(candidate[1])
+                if article:
+                    unflushed.append((candidate, article))
+                else:
+                    build_failed += 1
+                if len(unflushed) >= SCRAPE_FLUSH_SIZE:
+                    await flush()
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(outcome, tuple) and outcome[1] and outcome[0][1] not in collected:
+                    unflushed.append(outcome)
+            if unflushed:
+                try:
+                    await flush()
+                except Exception as e:
+                    logger.error(f"Error storing articles of {source['name']} built before the timeout: {e}")
+            raise
+        await flush(final=True)
+        
+        scrape_articles_total.inc(len(inserted), source=source['name'], outcome="added")
+        scrape_articles_total.inc(
+            len(existing_urls) + len(to_build) - build_failed - insert_failed - len(inserted), source=source['name'], outcome="duplicate"
+        )
+        scrape_articles_total.inc(build_failed + insert_failed, source=source['name'], outcome="failed")
+        scrape_articles_total.inc(articles_found - len(candidates), source=source['name'], outcome="seen")
+        scrape_articles_total.inc(deferred, source=source['name'], outcome="deferred")
+        
+        return ScrapeResult(
+            source_name=source['name'],
+            articles_found=articles_found,
+            articles_added=len(inserted),
+            articles_deferred=deferred,
+            articles_failed=build_failed + insert_failed,
+            page_bytes_fetched=page_bytes['fetched'],
+            page_bytes_used=page_bytes['used'],
+            article_ids=[article['id'] for article in inserted],
+            status="success",
+        )
+    
+    except HostCircuitOpen:
+        return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="circuit_open")
+    except LeaseLost as e:
+        logger.warning(str(e))
+        return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="lease_lost")
+    except Exception as e:
+        logger.error(f"Error scraping source {source['name']}: {e}")
+        return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status=f"error: {str(e)}")
+
+
+SOURCE_FAILURE_STATUSES = {"error", "timeout", "fetch_failed"}
+
+
+async def record_source_health(source: dict, result: ScrapeResult):
+    """Store the source's health after a scrape; the scheduler stretches its interval from it.
+
+    A skipped scrape (``circuit_open``) leaves the failure count as it was.
+    """
+    breaker = host_breaker(source['rss_url'])
+    previous = source.get('health') or {}
+    now = datetime.now(timezone.utc).isoformat()
+    outcome = result.status.split(':')[0]
+    failed = outcome in SOURCE_FAILURE_STATUSES
+    if outcome == "circuit_open":
+        failures = previous.get('consecutive_failures', 0)
+    else:
+        failures = previous.get('consecutive_failures', 0) + 1 if failed else 0
+    
+    error = result.status
+    if outcome == "fetch_failed" and breaker.last_error:
+        error = f"{outcome}: {breaker.last_error}"
+    if breaker.blocked:
+        status = "circuit_open"
+    elif failures:
+        status = "failing"
+    elif result.articles_failed or breaker.failure_rate > 0:
+        status = "degraded"
+    else:
+        status = "healthy"
+    health = SourceHealth(
+        status=status,
+        consecutive_failures=failures,
+        failure_rate=round(breaker.failure_rate, 3),
+        latency_ewma_ms=round(breaker.latency_ewma * 1000, 1) if breaker.latency_ewma is not None else None,
+        circuit_open_until=datetime.fromtimestamp(breaker.open_until, timezone.utc).isoformat() if breaker.blocked else None,
+        last_error=error if failed else previous.get('last_error'),
+        last_success_at=now if not failed and outcome != "circuit_open" else previous.get('last_success_at'),
+        checked_at=now,
+    ).model_dump()
+    source['health'] = health
+    await db.sources.update_one({"id": source['id']}, {"$set": {"health": health}})
+
+
+async def scrape_source_with_timeout(
+    source: dict, on_event: Optional[Callable[[str, dict], None]] = None, if_unchanged: bool = False
+) -> ScrapeResult:
+    """Scrape a source under its lease; ``leased`` means another worker has it.
+
+    The timeout covers the scrape itself, not the wait for a source slot.
+    """
+    async with source_semaphore:
+        lease_token = await acquire_source_lease(source, if_unchanged)
+        if lease_token is None:
+            result = ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="leased")
+        else:
+            stored: List[str] = []
+            try:
+                held = {"id": source['id'], "scrape_lease.token": lease_token}
+                async with LeaseHeartbeat(db.sources, held, "scrape_lease.expires_at", SCRAPE_LEASE_SECONDS):
+                    result = await asyncio.wait_for(scrape_source(source, on_event, lease_token, stored), timeout=SCRAPE_SOURCE_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out scraping source {source['name']} after {SCRAPE_SOURCE_TIMEOUT}s")
+                # Articles flushed before the timeout still need summaries
+                result = ScrapeResult(
+                    source_name=source['name'], articles_found=0, articles_added=len(stored), article_ids=stored, status="timeout"
+                )
+            finally:
+                await release_source_lease(source['id'], lease_token)
+    scrape_sources_total.inc(source=source['name'], outcome=result.status.split(':')[0])
+    if result.status not in ("leased", "lease_lost"):
+        try:
+            await record_source_health(source, result)
+        except Exception as e:
+            logger.error(f"Error recording health of source {source['name']}: {e}")
+    if on_event:
+        on_event("source", {"source_id": source['id'], **result.model_dump()})
+    return result
+
+
+async def scrape_sources(
+    sources: List[dict], on_event: Optional[Callable[[str, dict], None]] = None, if_unchanged: bool = False
+) -> List[ScrapeResult]:
+    """Scrape all sources concurrently; results are returned in input order.
+
+    ``on_event`` receives per-article events and a ``"source"`` event with
+    each ScrapeResult as soon as that source finishes. ``if_unchanged`` is
+    passed on to acquire_source_lease.
+    """
+    return await asyncio.gather(*(scrape_source_with_timeout(source, on_event, if_unchanged) for source in sources))
+
+
+# ===================== AI SUMMARIZER =====================
+
+class SharedRateLimiter:
+    """``rate`` acquisitions/second shared by every process, in bursts of at most ``capacity``.
+
+    Time is cut into windows of ``capacity / rate`` seconds. Each acquisition
+    increments the window's counter in ``db.rate_limits``; the first
+    ``capacity`` in a window go ahead and the rest wait for the next one.
+    Windows follow the wall clock, so hosts need synchronized clocks.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1, capacity)
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        window_seconds = self.capacity / self.rate
+        while True:
+            now = time.time()
+            window = int(now // window_seconds)
+            window_end = (window + 1) * window_seconds
+            try:
+                doc = await db.rate_limits.find_one_and_update(
+                    {"_id": f"{self.name}:{window}"},
+                    # The TTL index removes the counter once its window is over
+                    {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": datetime.fromtimestamp(window_end, timezone.utc)}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                # Another process created the window's counter first
+                continue
+            if doc['count'] <= self.capacity:
+                return
+            await asyncio.sleep(max(0.0, window_end - time.time()))
+
+
+llm_rate_limiter = SharedRateLimiter("llm", SUMMARY_RATE_PER_MINUTE / 60, SUMMARY_RATE_BURST)
+
+SUMMARY_CACHE_FIELDS = {"executive_summary", "key_points", "analysis", "takeaways", "summary_read_time_minutes"}
+
+
+async def publish_summary(summary: Summary):
+    await db.summaries.insert_one(summary.model_dump())
+    # Key points are copied onto the article so the text index covers them
+    card = await db.articles.find_one_and_update(
+        {"id": summary.article_id},
+        {"$set": {"status": "published", "summary_key_points": summary.key_points}},
+        projection=ARTICLE_LIST_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if card:
+        card['summary'] = summary.model_dump()
+        try:
+            await push_to_timelines(card)
+        except Exception as e:
+            logger.error(f"Error adding article {summary.article_id} to timelines, rebuild them to recover: {e}")
+    await bump_content_version()
+
+
+SUMMARY_SYSTEM_MESSAGE = "You are an expert news summarizer. Generate concise, insightful summaries of news articles."
+SUMMARY_JSON_FORMAT = """{
+    "executive_summary": "A 2-3 sentence overview of the article",
+    "key_points": ["Point 1", "Point 2", "Point 3", "Point 4"],
+    "analysis": "A brief analysis or context about why this matters",
+    "takeaways": ["Takeaway 1", "Takeaway 2", "Takeaway 3"]
+}"""
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; only used for packing
+    return len(text) // 4 + 1
+
+
+def parse_llm_json(text: str):
+    """The first JSON object or array in an LLM reply, tolerating code fences and chatter."""
+    text = re.sub(r'^\s*```(?:json)?|```\s*$', '', str(text).strip()).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r'[{\[]', text):
+        try:
+            return decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def as_text_list(value) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return []
+
+
+def summary_from_data(article_id: str, data) -> Optional[Summary]:
+    if not isinstance(data, dict) or not isinstance(data.get('executive_summary'), str) or not data['executive_summary'].strip():
+        return None
+    return Summary(
+        article_id=article_id,
+        executive_summary=data['executive_summary'].strip(),
+        key_points=as_text_list(data.get('key_points')),
+        analysis=str(data.get('analysis') or ''),
+        takeaways=as_text_list(data.get('takeaways')),
+    )
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split on line boundaries into pieces of at most ``max_tokens``; overlong lines are cut."""
+    max_chars = max_tokens * 4
+    chunks, current = [], ""
+    for line in text.split('\n'):
+        while len(line) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+# The LLM client drags in a large dependency tree, so it is imported by the
+# first summary rather than at startup
+LlmChat = None
+UserMessage = None
+
+
+def load_llm_client():
+    global LlmChat, UserMessage
+    if UserMessage is None:
+        from emergentintegrations.llm.chat import LlmChat as chat_class, UserMessage as message_class
+        # Keep a stand-in client that was installed before the first call
+        LlmChat = LlmChat or chat_class
+        UserMessage = message_class
+
+
+async def ask_llm(session_id: str, prompt: str, mode: str, source_name: str = "") -> str:
+    load_llm_client()
+    chat = LlmChat(
+        api_key=os.environ.get('EMERGENT_LLM_KEY'),
+        session_id=session_id,
+        system_message=SUMMARY_SYSTEM_MESSAGE
+    ).with_model("anthropic", "claude-sonnet-4-5-20250929")
+    
+    with track_stage("rate_limit", source_name):
+        await llm_rate_limiter.acquire()
+    with track_stage("summarize", source_name):
+        response = await chat.send_message(UserMessage(text=prompt))
+    llm_requests_total.inc(mode=mode)
+    return str(response)
+
+
+async def summarize_single(article: dict) -> Summary:
+    prompt = f"""Analyze and summarize this news article:
+
+Title: {article['title']}
+Content: {article['content']}
+
+Provide a structured summary in the following JSON format:
+{SUMMARY_JSON_FORMAT}
+
+Keep it concise and focused on the most important information."""
+    
+    response = await ask_llm(f"summarize-{article['id']}", prompt, "single", article['source_name'])
+    summary = summary_from_data(article['id'], parse_llm_json(response))
+    if summary is None:
+        raise ValueError(f"Unparseable summary response: {response[:200]!r}")
+    return summary
+
+
+async def summarize_long(article: dict) -> Summary:
+    """Map-reduce: summarize each chunk, then combine the chunk notes into one summary."""
+    chunks = split_into_chunks(article['content'], SUMMARY_CHUNK_TOKENS)
+    
+    async def summarize_chunk(index: int, chunk: str) -> str:
+        prompt = f"""This is part {index + 1} of {len(chunks)} of the news article "{article['title']}":
+
+{chunk}
+
+Summarize this part as JSON: {{"key_points": ["Point 1", "Point 2"], "notes": "2-3 sentences on what this part covers"}}"""
+        response = await ask_llm(f"summarize-{article['id']}-part{index + 1}", prompt, "map", article['source_name'])
+        data = parse_llm_json(response)
+        if not isinstance(data, dict):
+            return response.strip()
+        points = "\n".join(f"- {point}" for point in as_text_list(data.get('key_points')))
+        return f"{data.get('notes', '')}\n{points}".strip()
+    
+    notes = await asyncio.gather(*(summarize_chunk(index, chunk) for index, chunk in enumerate(chunks)))
+    parts = "\n\n".join(f"Part {index + 1}:\n{note}" for index, note in enumerate(notes))
+    prompt = f"""These are summaries of consecutive parts of the news article "{article['title']}":
+
+{parts}
+
+Combine them into one summary of the whole article in the following JSON format:
+{SUMMARY_JSON_FORMAT}
+
+Keep it concise and focused on the most important information."""
+    
+    response = await ask_llm(f"summarize-{article['id']}", prompt, "reduce", article['source_name'])
+    summary = summary_from_data(article['id'], parse_llm_json(response))
+    if summary is None:
+        raise ValueError(f"Unparseable summary response: {response[:200]!r}")
+    return summary
+
+
+async def summarize_batch(articles: List[dict]) -> Dict[str, Summary]:
+    """Summarize several short articles in one request.
+
+    Articles are labelled A1..An rather than by id so the model only has to
+    echo short labels; articles missing from the reply are left out of the
+    result for the caller to retry on their own.
+    """
+    labels = {f"A{index + 1}": article for index, article in enumerate(articles)}
+    sections = "\n\n".join(
+        f"=== Article {label} ===\nTitle: {article['title']}\nContent: {article['content']}"
+        for label, article in labels.items()
+    )
+    prompt = f"""Analyze and summarize each of these {len(articles)} news articles independently:
+
+{sections}
+
+Respond with a JSON object {{"summaries": [...]}} holding one entry per article, each with an "id" field set to the
+article's label (A1, A2, ...) plus the fields of this format:
+{SUMMARY_JSON_FORMAT}
+
+Keep each summary concise and focused on the most important information."""
+    
+    response = await ask_llm(f"summarize-batch-{uuid.uuid4()}", prompt, "batch", articles[0]['source_name'])
+    data = parse_llm_json(response)
+    entries = data.get('summaries') if isinstance(data, dict) else data
+    summaries = {}
+    for entry in entries if isinstance(entries, list) else []:
+        article = labels.get(str(entry.get('id', '')).strip()) if isinstance(entry, dict) else None
+        summary = summary_from_data(article['id'], entry) if article else None
+        if summary:
+            summaries[article['id']] = summary
+    return summaries
+
+
+async def summarize_one(article: dict) -> Summary:
+    if estimate_tokens(article['content']) > SUMMARY_CHUNK_TOKENS:
+        return await summarize_long(article)
+    return await summarize_single(article)
+
+
+def plan_summary_groups(articles: List[dict]) -> List[List[dict]]:
+    """Pack short articles into batches under the token budget; everything else goes alone."""
+    groups, batch, batch_tokens = [], [], 0
+    for article in sorted(articles, key=lambda article: len(article['content'])):
+        tokens = estimate_tokens(article['content'])
+        if SUMMARY_BATCH_MAX_ARTICLES <= 1 or tokens > SUMMARY_BATCH_ARTICLE_TOKENS:
+            groups.append([article])
+            continue
+        if batch and (batch_tokens + tokens > SUMMARY_BATCH_TOKEN_BUDGET or len(batch) >= SUMMARY_BATCH_MAX_ARTICLES):
+            groups.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(article)
+        batch_tokens += tokens
+    if batch:
+        groups.append(batch)
+    return groups
+
+
+async def summarize_group(group: List[dict]) -> Dict[str, Any]:
+    outcomes: Dict[str, Any] = {}
+    if len(group) > 1:
+        try:
+            outcomes.update(await summarize_batch(group))
+        except Exception as e:
+            logger.warning(f"Batch summary of {len(group)} articles failed, summarizing them one by one: {e}")
+    for article in group:
+        if article['id'] not in outcomes:
+            try:
+                outcomes[article['id']] = await summarize_one(article)
+            except Exception as e:
+                outcomes[article['id']] = e
+    return outcomes
+
+
+async def create_summaries(
+    article_ids: List[str], fence: Optional[Callable[[str], Awaitable[bool]]] = None
+) -> Dict[str, Any]:
+    """Summarize and publish several articles with as few LLM requests as possible.
+
+    Returns each article id mapped to its Summary, None when there is
+    nothing to summarize (missing article or no content), or the exception
+    that summarizing it raised. ``fence``, if given, is awaited right before
+    each publish; when it returns False the summary is dropped as LeaseLost.
+    """
+    results: Dict[str, Any] = {article_id: None for article_id in article_ids}
+    articles = await db.articles.find({"id": {"$in": article_ids}}, {"_id": 0}).to_list(None)
+    
+    # Syndicated and re-posted copies reuse the summary of identical text
+    fingerprints = {}
+    pending = []
+    for article in articles:
+        if not article.get('content'):
+            continue
+        fingerprint = fingerprints[article['id']] = article.get('content_hash') or content_fingerprint(article['content'])
+        cached = None
+        if fingerprint:
+            cached = await db.summary_cache.find_one({"fingerprint": fingerprint}, {"_id": 0, "fingerprint": 0})
+        if cached:
+            if fence and not await fence(article['id']):
+                results[article['id']] = LeaseLost(f"Lost the summary lease for article {article['id']}")
+                continue
+            summary = Summary(article_id=article['id'], **{k: v for k, v in cached.items() if k in SUMMARY_CACHE_FIELDS})
+            await publish_summary(summary)
+            summaries_total.inc(outcome="cached")
+            results[article['id']] = summary
+        else:
+            pending.append(article)
+    
+    for outcomes in await asyncio.gather(*(summarize_group(group) for group in plan_summary_groups(pending))):
+        for article_id, outcome in outcomes.items():
+            results[article_id] = outcome
+            if not isinstance(outcome, Summary):
+                continue
+            if fence and not await fence(article_id):
+                results[article_id] = LeaseLost(f"Lost the summary lease for article {article_id}")
+                continue
+            await publish_summary(outcome)
+            fingerprint = fingerprints.get(article_id)
+            if fingerprint:
+                await db.summary_cache.update_one(
+                    {"fingerprint": fingerprint},
+                    {"$setOnInsert": {"fingerprint": fingerprint, **outcome.model_dump(include=SUMMARY_CACHE_FIELDS)}},
+                    upsert=True
+                )
+            summaries_total.inc(outcome="generated")
+    
+    return results
+
+
+async def create_summary(article_id: str) -> Optional[Summary]:
+    """Summarize one article and publish it; errors propagate to the caller."""
+    result = (await create_summaries([article_id]))[article_id]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+async def generate_summary(article_id: str) -> Optional[Summary]:
+    try:
+        return await create_summary(article_id)
+    except Exception as e:
+        logger.error(f"Error generating summary for article {article_id}: {e}")
+        summaries_total.inc(outcome="failed")
+        await db.articles.update_one({"id": article_id}, {"$set": {"status": "failed"}})
+        return None
+
+
+# ===================== SUMMARY JOB QUEUE =====================
+
+# Job states: queued -> running -> done, or back to queued with a backoff
+# delay on failure, or dead once SUMMARY_MAX_ATTEMPTS is exhausted.
+SUMMARY_JOB_STATES = ["queued", "running", "done", "dead"]
+
+
+def utc_iso(offset_seconds: float = 0) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
+
+
+async def enqueue_summaries(article_ids: List[str]) -> int:
+    """Create one queued job per article; articles that already have a job are left alone.
+
+    Returns how many jobs were created.
+    """
+    if not article_ids:
+        return 0
+    now = utc_iso()
+    jobs = [
+        UpdateOne(
+            {"article_id": article_id},
+            {"$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "article_id": article_id,
+                "state": "queued",
+                "attempts": 0,
+                "run_at": now,
+                "locked_until": None,
+                "worker_id": None,
+                "lease_token": 0,
+                "last_error": None,
+                "created_at": now,
+                "updated_at": now,
+            }},
+            upsert=True,
+        )
+        for article_id in article_ids
+    ]
+    try:
+        created = (await db.summary_jobs.bulk_write(jobs, ordered=False)).upserted_count
+    except BulkWriteError as e:
+        # Concurrent upserts of one article race on the unique index; the
+        # loser finds the winner's job, which is all it wanted
+        if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+            raise
+        created = e.details.get('nUpserted', 0)
+    summary_workers.notify()
+    return created
+
+
+async def enqueue_pending_summaries(batch_size: int = 500) -> int:
+    """Queue a job for every pending article that has none; returns how many were queued.
+
+    Articles are queued as they are stored, so this only finds those whose
+    process died in between, or whose queueing failed.
+    """
+    created = 0
+    batch = []
+    async for article in db.articles.find({"status": "pending"}, {"_id": 0, "id": 1}):
+        batch.append(article['id'])
+        if len(batch) >= batch_size:
+            created += await enqueue_summaries(batch)
+            batch = []
+    return created + await enqueue_summaries(batch)
+
+
+async def claim_summary_job(worker_id: str) -> Optional[dict]:
+    """Atomically take the oldest runnable job, including ones whose lease expired.
+
+    Every claim increments ``lease_token``; the job is only updated while
+    the token is still the one this claim returned.
+    """
+    now = utc_iso()
+    return await db.summary_jobs.find_one_and_update(
+        {"$or": [
+            {"state": "queued", "run_at": {"$lte": now}},
+            {"state": "running", "locked_until": {"$lte": now}},
+        ]},
+        {
+            "$set": {
+                "state": "running",
+                "worker_id": worker_id,
+                "locked_until": utc_iso(SUMMARY_JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1, "lease_token": 1},
+        },
+        sort=[("run_at", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def claim_batch_companions(job: dict, worker_id: str) -> List[dict]:
+    """Claim more ready jobs to summarize in one batch with ``job``.
+
+    Only short articles are batched; a claimed job whose article is too long
+    or would overflow the token budget is handed straight back to the queue.
+    """
+    if SUMMARY_BATCH_MAX_ARTICLES <= 1:
+        return []
+    article = await db.articles.find_one({"id": job['article_id']}, {"_id": 0, "content": 1})
+    tokens = estimate_tokens(article.get('content') or '') if article else 0
+    if not article or tokens > SUMMARY_BATCH_ARTICLE_TOKENS:
+        return []
+    
+    companions = []
+    while len(companions) < SUMMARY_BATCH_MAX_ARTICLES - 1:
+        companion = await claim_summary_job(worker_id)
+        if companion is None:
+            break
+        article = await db.articles.find_one({"id": companion['article_id']}, {"_id": 0, "content": 1})
+        companion_tokens = estimate_tokens(article.get('content') or '') if article else 0
+        if companion_tokens > SUMMARY_BATCH_ARTICLE_TOKENS or tokens + companion_tokens > SUMMARY_BATCH_TOKEN_BUDGET:
+            await db.summary_jobs.update_one(
+                {"id": companion['id'], "lease_token": companion['lease_token'], "state": "running"},
+                {"$set": {"state": "queued", "locked_until": None, "worker_id": None, "updated_at": utc_iso()}, "$inc": {"attempts": -1}}
+            )
+            break
+        companions.append(companion)
+        tokens += companion_tokens
+    return companions
+
+
+async def finish_summary_job(job: dict, worker_id: str, outcome):
+    owned = {"id": job['id'], "lease_token": job['lease_token'], "state": "running"}
+    if isinstance(outcome, LeaseLost):
+        # The worker that took the job over records its outcome
+        logger.warning(f"Summary job for article {job['article_id']} was taken over from {worker_id}")
+        return
+    if isinstance(outcome, Exception):
+        error = f"{type(outcome).__name__}: {outcome}"
+        if job['attempts'] >= SUMMARY_MAX_ATTEMPTS:
+            logger.error(f"Summary job for article {job['article_id']} dead after {job['attempts']} attempts: {error}")
+            summaries_total.inc(outcome="failed")
+            await db.summary_jobs.update_one(owned, {"$set": {"state": "dead", "locked_until": None, "last_error": error, "updated_at": utc_iso()}})
+            await db.articles.update_one({"id": job['article_id']}, {"$set": {"status": "failed"}})
+            return
+        delay = min(SUMMARY_RETRY_MAX_SECONDS, SUMMARY_RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1))
+        delay *= random.uniform(0.8, 1.2)
+        logger.warning(f"Summary job for article {job['article_id']} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {error}")
+        summaries_total.inc(outcome="retried")
+        await db.summary_jobs.update_one(owned, {"$set": {
+            "state": "queued", "run_at": utc_iso(delay), "locked_until": None, "last_error": error, "updated_at": utc_iso(),
+        }})
+        return
+    
+    if outcome is None:
+        # Missing article or empty content will not improve on retry; the
+        # article leaves pending so it is not picked up again
+        await db.summary_jobs.update_one(owned, {"$set": {"state": "dead", "locked_until": None, "last_error": "Article has no content", "updated_at": utc_iso()}})
+        await db.articles.update_one({"id": job['article_id'], "status": "pending"}, {"$set": {"status": "failed"}})
+    else:
+        await db.summary_jobs.update_one(owned, {"$set": {"state": "done", "locked_until": None, "updated_at": utc_iso()}})
+
+
+async def run_summary_jobs(jobs: List[dict], worker_id: str):
+    by_article = {job['article_id']: job for job in jobs}
+    
+    async def still_leased(article_id: str) -> bool:
+        job = by_article[article_id]
+        renewed = await db.summary_jobs.update_one(
+            {"id": job['id'], "lease_token": job['lease_token'], "state": "running"},
+            {"$set": {"locked_until": utc_iso(SUMMARY_JOB_LEASE_SECONDS)}},
+        )
+        return renewed.matched_count > 0
+    
+    held = {"$or": [{"id": job['id'], "lease_token": job['lease_token']} for job in jobs], "state": "running"}
+    try:
+        async with LeaseHeartbeat(db.summary_jobs, held, "locked_until", SUMMARY_JOB_LEASE_SECONDS):
+            outcomes = await create_summaries(list(by_article), fence=still_leased)
+    except Exception as e:
+        outcomes = {job['article_id']: e for job in jobs}
+    for job in jobs:
+        await finish_summary_job(job, worker_id, outcomes.get(job['article_id']))
+
+
+async def summary_queue_stats() -> dict:
+    counts = {state: 0 for state in SUMMARY_JOB_STATES}
+    async for row in db.summary_jobs.aggregate([{"$group": {"_id": "$state", "count": {"$sum": 1}}}]):
+        counts[row['_id']] = row['count']
+    ready = await db.summary_jobs.count_documents({"state": "queued", "run_at": {"$lte": utc_iso()}})
+    return {
+        "depth": counts['queued'] + counts['running'],
+        "ready": ready,
+        "states": counts,
+        "workers": summary_workers.size,
+    }
+
+
+class SummaryWorkerPool:
+    """Fixed-size pool of coroutines that drain the summary job queue."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def start(self):
+        self._stopping = False
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [asyncio.create_task(self._work(f"{worker_prefix}:{n}")) for n in range(self.size)]
+        logger.info(f"Started {self.size} summary workers")
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def _work(self, worker_id: str):
+        while not self._stopping:
+            try:
+                job = await claim_summary_job(worker_id)
+                if job is not None:
+                    await run_summary_jobs([job, *await claim_batch_companions(job, worker_id)], worker_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Summary worker {worker_id} error: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=SUMMARY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+summary_workers = SummaryWorkerPool(SUMMARY_WORKERS)
+
+
+# ===================== SCHEDULER =====================
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+class SourceScheduler:
+    """In-process scheduler that scrapes each active source on its own interval.
+
+    The queue is a heap of ``(due_at, priority_rank, seq, source_id)``.
+    Re-scheduling a source pushes a fresh tuple and records its ``seq``;
+    tuples whose ``seq`` no longer matches are discarded when popped.
+
+    Every process runs its own scheduler. Due sources are claimed through
+    scrape leases, so a source due in several processes is scraped by one of
+    them, and the queue is re-synced from the database every
+    SCHEDULER_SYNC_SECONDS to pick up scrapes, edits and new sources from
+    other processes.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries: Dict[str, dict] = {}
+        self._running = set()
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._batches = set()
+        self._stopping = False
+        self._synced_at = 0.0
+
+    async def start(self):
+        self._stopping = False
+        await self.sync()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Scheduler started with {len(self._entries)} sources")
+
+    async def stop(self):
+        # The flag covers a cancel that lands while wait_for is completing
+        self._stopping = True
+        self._wakeup.set()
+        tasks = [task for task in [self._task, *self._batches] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    @staticmethod
+    def _signature(source: dict) -> tuple:
+        lease = source.get('scrape_lease') or {}
+        health = source.get('health') or {}
+        return (
+            source.get('is_active', True), source.get('priority'), source.get('scrape_interval_minutes'),
+            source.get('last_scrape'), lease.get('token'), health.get('consecutive_failures'), health.get('circuit_open_until'),
+        )
+
+    async def sync(self):
+        """Reload active sources, re-timing only the ones whose schedule inputs changed."""
+        self._synced_at = time.time()
+        sources = await db.sources.find({"is_active": True}, {"_id": 0}).to_list(None)
+        active = {source['id'] for source in sources}
+        for source_id in [source_id for source_id in self._entries if source_id not in active and source_id not in self._running]:
+            self.remove(source_id)
+        for source in sources:
+            entry = self._entries.get(source['id'])
+            if source['id'] in self._running or (entry and self._signature(entry['source']) == self._signature(source)):
+                continue
+            self.upsert(source)
+
+    def upsert(self, source: dict, just_scraped: bool = False, delay: Optional[float] = None):
+        """Add or re-time a source; inactive sources are dropped from the queue.
+
+        ``delay`` overrides the interval, e.g. to come back for entries a
+        scrape deferred.
+        """
+        if not source.get('is_active', True):
+            self.remove(source['id'])
+            return
+        interval = max(1, source.get('scrape_interval_minutes') or 60) * 60
+        health = source.get('health') or {}
+        if health.get('consecutive_failures'):
+            # Back off a failing source instead of hitting it at its full rate
+            interval *= min(2 ** health['consecutive_failures'], max(1, SCRAPE_BACKOFF_MAX_MULTIPLIER))
+        now = time.time()
+        # Failed scrapes do not set last_scrape, but do release the lease
+        lease = source.get('scrape_lease') or {}
+        last_run = max(filter(None, [source.get('last_scrape'), lease.get('finished_at')]), default=None)
+        if delay is not None:
+            base, interval = now, delay
+        elif just_scraped or not last_run:
+            base = now if just_scraped else now - interval
+        else:
+            base = datetime.fromisoformat(last_run).timestamp()
+        # Jitter spreads sources that share an interval instead of firing together
+        due_at = max(base + interval, now) + random.uniform(0, min(SCHEDULER_JITTER_SECONDS, interval / 10))
+        if health.get('circuit_open_until'):
+            due_at = max(due_at, datetime.fromisoformat(health['circuit_open_until']).timestamp())
+        if lease.get('expires_at') and lease.get('owner') != lease_owner():
+            # Another process is scraping it; look again once that lease lapses
+            due_at = max(due_at, datetime.fromisoformat(lease['expires_at']).timestamp())
+        rank = PRIORITY_RANK.get(source.get('priority'), PRIORITY_RANK['medium'])
+        seq = next(self._seq)
+        self._entries[source['id']] = {"source": source, "due_at": due_at, "rank": rank, "seq": seq}
+        heapq.heappush(self._heap, (due_at, rank, seq, source['id']))
+        self._wakeup.set()
+
+    def remove(self, source_id: str):
+        if self._entries.pop(source_id, None) is not None:
+            self._wakeup.set()
+
+    def snapshot(self) -> dict:
+        queue = sorted(self._entries.values(), key=lambda e: (e['due_at'], e['rank']))
+        return {
+            "enabled": self._task is not None,
+            "running": [
+                {"source_id": source_id, "source_name": self._entries.get(source_id, {}).get('source', {}).get('name')}
+                for source_id in self._running
+            ],
+            "queue": [
+                {
+                    "source_id": entry['source']['id'],
+                    "source_name": entry['source']['name'],
+                    "priority": entry['source'].get('priority', 'medium'),
+                    "scrape_interval_minutes": entry['source'].get('scrape_interval_minutes', 60),
+                    "health": (entry['source'].get('health') or {}).get('status', 'healthy'),
+                    "due_at": datetime.fromtimestamp(entry['due_at'], timezone.utc).isoformat(),
+                }
+                for entry in queue
+            ],
+        }
+
+    def _pop_due(self) -> List[dict]:
+        # Sources that are mid-scrape are re-queued by _run_batch when they finish
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, seq, source_id = heapq.heappop(self._heap)
+            entry = self._entries.get(source_id)
+            if entry is None or entry['seq'] != seq or source_id in self._running:
+                continue
+            due.append(entry)
+        # High-priority sources claim scrape slots first
+        due.sort(key=lambda e: (e['rank'], e['due_at']))
+        return due
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            due = self._pop_due()
+            if due:
+                self._running.update(entry['source']['id'] for entry in due)
+                task = asyncio.create_task(self._run_batch(due))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+                continue
+            next_sync = self._synced_at + SCHEDULER_SYNC_SECONDS
+            if time.time() >= next_sync:
+                try:
+                    await self.sync()
+                except Exception as e:
+                    logger.error(f"Scheduler sync failed: {e}")
+                    self._synced_at = time.time()
+                continue
+            timeout = min(self._heap[0][0], next_sync) - time.time() if self._heap else next_sync - time.time()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_batch(self, entries: List[dict]):
+        sources = [entry['source'] for entry in entries]
+        try:
+            # Only claim sources nobody has scraped since this process loaded them
+            results = await scrape_sources(sources, if_unchanged=True)
+            # Reload so the next run sees fresh last_scrape, feed validators,
+            # leases and any edits made while the scrape was in flight
+            fresh = {
+                doc['id']: doc
+                for doc in await db.sources.find({"id": {"$in": [s['id'] for s in sources]}}, {"_id": 0}).to_list(None)
+            }
+            for source, result in zip(sources, results):
+                self._running.discard(source['id'])
+                if source['id'] in self._entries:
+                    delay = SCRAPE_BACKLOG_DELAY_SECONDS if result.articles_deferred else None
+                    scraped_here = result.status not in ("leased", "lease_lost")
+                    self.upsert(fresh.get(source['id'], self._entries[source['id']]['source']), just_scraped=scraped_here, delay=delay)
+        except Exception as e:
+            logger.error(f"Scheduled scrape failed: {e}")
+        finally:
+            for source in sources:
+                if source['id'] in self._running:
+                    self._running.discard(source['id'])
+                    if source['id'] in self._entries:
+                        self.upsert(self._entries[source['id']]['source'], just_scraped=True)
+            self._wakeup.set()
+
+
+scheduler = SourceScheduler()
+
+
+# ===================== SCRAPE JOBS =====================
+
+class ScrapeJob:
+    """A scrape started in the background, with an append-only event log.
+
+    Events are numbered from 1 so clients can resume a stream with
+    ``Last-Event-ID``. Listeners wait on ``_changed``, which is replaced
+    after every append.
+    """
+
+    def __init__(self, sources: List[dict]):
+        self.id = str(uuid.uuid4())
+        self.status = "running"
+        self.total_sources = len(sources)
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at: Optional[str] = None
+        self.results: List[dict] = []
+        self.events: List[dict] = []
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    def emit(self, event_type: str, data: dict):
+        if event_type == "source":
+            self.results.append(data)
+        self.events.append({"id": len(self.events) + 1, "event": event_type, "data": data})
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def changed(self) -> asyncio.Event:
+        return self._changed
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc).isoformat()
+        self.emit("done", {
+            "status": status,
+            "error": error,
+            "total_sources": self.total_sources,
+            "articles_added": sum(result['articles_added'] for result in self.results),
+        })
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "total_sources": self.total_sources,
+            "sources_completed": len(self.results),
+            "articles_added": sum(result['articles_added'] for result in self.results),
+            "last_event_id": len(self.events),
+            "results": self.results,
+        }
+
+
+# Jobs live in this process only; streams must reach the process that started them
+scrape_jobs = LRUTTLCache(SCRAPE_JOB_RETENTION, SCRAPE_JOB_TTL)
+
+
+async def run_scrape_job(job: ScrapeJob, sources: List[dict]):
+    try:
+        await scrape_sources(sources, on_event=job.emit)
+        job.finish("completed")
+    except Exception as e:
+        logger.error(f"Scrape job {job.id} failed: {e}")
+        job.finish("failed", str(e))
+
+
+def start_scrape_job(sources: List[dict]) -> ScrapeJob:
+    job = ScrapeJob(sources)
+    scrape_jobs.set(job.id, job)
+    job.task = asyncio.create_task(run_scrape_job(job, sources))
+    return job
+
+
+def format_job_event(event: dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps(event) + "\n"
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def stream_job_events(job: ScrapeJob, last_event_id: int, fmt: str):
+    position = max(0, last_event_id)
+    while True:
+        changed = job.changed()
+        for event in job.events[position:]:
+            yield format_job_event(event, fmt)
+        position = len(job.events)
+        if job.done:
+            return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=SCRAPE_STREAM_KEEPALIVE)
+        except asyncio.TimeoutError:
+            # Comment line keeps proxies from closing an idle SSE connection
+            if fmt == "sse":
+                yield ": keepalive\n\n"
+
+
+# ===================== ANALYTICS =====================
+
+ROLLUP_PERIODS = ("total", "day", "hour")
+
+
+def rollup_buckets(timestamp: str) -> Dict[str, str]:
+    try:
+        moment = datetime.fromisoformat(timestamp).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        moment = datetime.now(timezone.utc)
+    return {"total": "all", "day": moment.strftime("%Y-%m-%d"), "hour": moment.strftime("%Y-%m-%dT%H")}
+
+
+def rollup_id(period: str, bucket: str, event_type: str, article_id: Optional[str]) -> str:
+    return f"{period}:{bucket}:{event_type}:{article_id or '*'}"
+
+
+def rollup_updates(events: List[dict]) -> List[UpdateOne]:
+    """Fold a batch of events into one $inc per (period, bucket, event type, article)."""
+    counts = Counter()
+    for event in events:
+        for period, bucket in rollup_buckets(event.get('timestamp')).items():
+            counts[(period, bucket, event['event_type'], None)] += 1
+            if event.get('article_id'):
+                counts[(period, bucket, event['event_type'], event['article_id'])] += 1
+    return [
+        UpdateOne(
+            {"_id": rollup_id(period, bucket, event_type, article_id)},
+            {
+                "$inc": {"count": count},
+                "$setOnInsert": {"period": period, "bucket": bucket, "event_type": event_type, "article_id": article_id},
+            },
+            upsert=True,
+        )
+        for (period, bucket, event_type, article_id), count in counts.items()
+    ]
+
+
+class AnalyticsBuffer:
+    """Buffers analytics events in memory and writes them in batches.
+
+    A batch is flushed once ANALYTICS_FLUSH_SIZE events are waiting or every
+    ANALYTICS_FLUSH_INTERVAL seconds, whichever comes first, and once more on
+    shutdown. Each flush also bumps the pre-aggregated rollup counters.
+
+    The event insert and the rollup increments are retried separately: a
+    failed rollup write keeps only the increments that did not apply, and
+    events that an earlier attempt already inserted (the insert set their
+    ``_id``) count as inserted when they come back as duplicates.
+    """
+
+    def __init__(self, max_size: int, interval: float):
+        self.max_size = max_size
+        self.interval = interval
+        self._events: List[dict] = []
+        self._rollups: List[UpdateOne] = []
+        self._flush_needed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add(self, event: dict):
+        self._events.append(event)
+        if len(self._events) >= self.max_size:
+            self._flush_needed.set()
+
+    def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def _requeue(self, pending: list, items: list):
+        # Keep failed work for the next flush unless the backlog is runaway
+        if items and len(pending) < self.max_size * 10:
+            pending[:0] = items
+
+    async def flush(self):
+        async with self._lock:
+            events, self._events = self._events, []
+            if events:
+                failed = []
+                try:
+                    await db.analytics_events.insert_many(events, ordered=False)
+                except BulkWriteError as e:
+                    failed = sorted(error['index'] for error in e.details.get('writeErrors', []) if error.get('code') != 11000)
+                    if failed:
+                        logger.error(f"Error inserting {len(failed)} of {len(events)} analytics events: {e}")
+                except Exception as e:
+                    logger.error(f"Error inserting {len(events)} analytics events: {e}")
+                    failed = list(range(len(events)))
+                failed_indexes = set(failed)
+                self._requeue(self._events, [events[index] for index in failed])
+                self._rollups.extend(rollup_updates([event for index, event in enumerate(events) if index not in failed_indexes]))
+            
+            updates, self._rollups = self._rollups, []
+            if not updates:
+                return
+            try:
+                await db.analytics_rollups.bulk_write(updates, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything but the reported operations was applied
+                retry = [updates[error['index']] for error in e.details.get('writeErrors', [])]
+                logger.error(f"Error applying {len(retry)} of {len(updates)} analytics rollup updates: {e}")
+                self._requeue(self._rollups, retry)
+            except Exception as e:
+                logger.error(f"Error applying {len(updates)} analytics rollup updates: {e}")
+                self._requeue(self._rollups, updates)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            await self.flush()
+
+
+analytics_buffer = AnalyticsBuffer(ANALYTICS_FLUSH_SIZE, ANALYTICS_FLUSH_INTERVAL)
+
+
+async def get_rollup_counts(event_types: List[str], period: str = "total", bucket: str = "all", article_id: Optional[str] = None) -> Dict[str, int]:
+    ids = [rollup_id(period, bucket, event_type, article_id) for event_type in event_types]
+    docs = await db.analytics_rollups.find({"_id": {"$in": ids}}).to_list(len(ids))
+    counts = {doc['event_type']: doc['count'] for doc in docs}
+    return {event_type: counts.get(event_type, 0) for event_type in event_types}
+
+
+async def rebuild_analytics_rollups():
+    """Recompute every rollup from the raw events, e.g. after enabling rollups on existing data."""
+    await db.analytics_rollups.delete_many({})
+    bucket_exprs = {
+        "total": "all",
+        "day": {"$substrBytes": ["$timestamp", 0, 10]},
+        "hour": {"$substrBytes": ["$timestamp", 0, 13]},
+    }
+    for period, bucket in bucket_exprs.items():
+        for per_article in (False, True):
+            group_id = {"bucket": bucket, "event_type": "$event_type", "article_id": "$article_id" if per_article else None}
+            pipeline = [{"$match": {"article_id": {"$ne": None}}}] if per_article else []
+            pipeline += [
+                {"$group": {"_id": group_id, "count": {"$sum": 1}}},
+                {"$project": {
+                    "_id": {"$concat": [
+                        period, ":", "$_id.bucket", ":", "$_id.event_type", ":",
+                        {"$ifNull": ["$_id.article_id", "*"]},
+                    ]},
+                    "period": period,
+                    "bucket": "$_id.bucket",
+                    "event_type": "$_id.event_type",
+                    "article_id": "$_id.article_id",
+                    "count": 1,
+                }},
+                {"$merge": {"into": "analytics_rollups", "whenMatched": "replace"}},
+            ]
+            await db.analytics_events.aggregate(pipeline).to_list(None)
+
+
+# ===================== SEARCH =====================
+
+SEARCH_INDEX_WEIGHTS = {"title": 10, "summary_key_points": 5, "excerpt": 3, "content": 1}
+
+
+async def ensure_search_index():
+    """Create the weighted article text index.
+
+    MongoDB maintains it on every write, so articles become searchable when
+    scrape_source inserts them and pick up key points when their summary
+    is published.
+    """
+    await db.articles.create_index(
+        [(field, "text") for field in SEARCH_INDEX_WEIGHTS],
+        weights=SEARCH_INDEX_WEIGHTS,
+        name="article_text",
+        default_language="english"
+    )
+
+
+async def backfill_search_key_points() -> int:
+    """Copy key points from summaries published before they were denormalized."""
+    updates = []
+    async for summary in db.summaries.find({}, {"_id": 0, "article_id": 1, "key_points": 1}):
+        updates.append(UpdateOne(
+            {"id": summary['article_id'], "summary_key_points": {"$exists": False}},
+            {"$set": {"summary_key_points": summary.get('key_points', [])}}
+        ))
+    if not updates:
+        return 0
+    result = await db.articles.bulk_write(updates, ordered=False)
+    return result.modified_count
+
+
+# ===================== TIMELINES =====================
+
+# Each timeline document holds the newest TIMELINE_SIZE published article
+# cards (list fields plus summary) for one category, or for every category
+# under TIMELINE_ALL, so a first page is one document read. ``version`` is
+# bumped by every publish so a rebuild can tell it raced one.
+TIMELINE_ALL = "*"
+TIMELINE_SORT = {"created_at": -1, "id": -1}
+
+
+def timeline_keys(categories: List[str]) -> List[str]:
+    return [TIMELINE_ALL, *dict.fromkeys(categories)]
+
+
+async def push_to_timelines(card: dict):
+    """Insert (or move) a just-published article card on its category timelines."""
+    operations = []
+    for key in timeline_keys(card.get('categories') or []):
+        operations.append(UpdateOne({"_id": key}, {"$pull": {"articles": {"id": card['id']}}}))
+        operations.append(UpdateOne(
+            {"_id": key},
+            {
+                "$push": {"articles": {"$each": [card], "$sort": TIMELINE_SORT, "$slice": TIMELINE_SIZE}},
+                "$inc": {"version": 1},
+                # A timeline first created here only holds new publishes and
+                # is not served until the rebuild scheduled below completes it
+                "$setOnInsert": {"complete": False},
+            },
+            upsert=True,
+        ))
+    result = await db.category_timelines.bulk_write(operations, ordered=True)
+    for key in result.upserted_ids.values():
+        schedule_timeline_rebuild(key)
 
 
-class Bookmark(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    user_id: str
-    article_id: str
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+# Rebuilds running in this process by timeline key, which also keeps the
+# tasks referenced until they finish
+timeline_rebuilds: Dict[str, asyncio.Task] = {}
 
 
-class AnalyticsEvent(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    event_type: str
-    article_id: Optional[str] = None
-    user_id: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = {}
-    timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+def schedule_timeline_rebuild(key: str):
+    """Rebuild a timeline in the background unless this process already is."""
+    if key in timeline_rebuilds:
+        return
+    
+    async def rebuild():
+        try:
+            count = await rebuild_category_timeline(None if key == TIMELINE_ALL else key)
+            logger.info(f"Built timeline {key} with {count} articles")
+        except Exception as e:
+            logger.error(f"Error rebuilding timeline {key}: {e}")
+        finally:
+            timeline_rebuilds.pop(key, None)
+    
+    timeline_rebuilds[key] = asyncio.create_task(rebuild())
 
 
-class ScrapeRequest(BaseModel):
-    category: Optional[str] = None
+async def rebuild_category_timeline(category: Optional[str] = None) -> int:
+    """Rebuild one timeline from the articles collection; returns its length.
 
+    The write only lands if no publish touched the timeline since it was
+    read, otherwise the rebuild starts over.
+    """
+    key = category or TIMELINE_ALL
+    query = {"status": "published"}
+    if category:
+        query['categories'] = category
+    for _ in range(5):
+        current = await db.category_timelines.find_one({"_id": key}, {"_id": 0, "version": 1})
+        version = current.get('version', 0) if current else 0
+        articles = await db.articles.find(query, ARTICLE_LIST_PROJECTION).sort(ARTICLE_FEED_SORT).limit(TIMELINE_SIZE).to_list(TIMELINE_SIZE)
+        await attach_summaries(articles)
+        try:
+            result = await db.category_timelines.update_one(
+                {"_id": key, "version": version},
+                {"$set": {
+                    "articles": articles,
+                    "complete": True,
+                    "size": TIMELINE_SIZE,
+                    "rebuilt_at": datetime.now(timezone.utc).isoformat(),
+                }},
+                upsert=current is None,
+            )
+        except DuplicateKeyError:
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return len(articles)
+    raise RuntimeError(f"Timeline {key} kept changing during rebuild")
+
+
+async def rebuild_category_timelines(only_missing: bool = False) -> Dict[str, int]:
+    """Rebuild the "all" timeline and one per published category."""
+    categories = [category for category in await db.articles.distinct("categories", {"status": "published"}) if category]
+    if only_missing:
+        ready = {
+            doc['_id'] async for doc in db.category_timelines.find({"complete": True, "size": TIMELINE_SIZE}, {"_id": 1})
+        }
+        categories = [category for category in categories if category not in ready]
+        include_all = TIMELINE_ALL not in ready
+    else:
+        include_all = True
+    rebuilt = {}
+    if include_all:
+        rebuilt[TIMELINE_ALL] = await rebuild_category_timeline(None)
+    for category in categories:
+        rebuilt[category] = await rebuild_category_timeline(category)
+    return rebuilt
+
+
+async def read_timeline(category: Optional[str], offset: int, limit: int) -> Optional[List[dict]]:
+    """Cards ``offset..offset+limit`` from a materialized timeline, or None to query instead."""
+    if offset < 0 or limit <= 0 or offset + limit > TIMELINE_SIZE:
+        return None
+    key = category or TIMELINE_ALL
+    doc = await db.category_timelines.find_one(
+        {"_id": key}, {"_id": 0, "complete": 1, "size": 1, "articles": {"$slice": [offset, limit]}}
+    )
+    if doc is None:
+        return None
+    if not doc.get('complete') or doc.get('size') != TIMELINE_SIZE:
+        # Started by a publish, or built for another TIMELINE_SIZE
+        schedule_timeline_rebuild(key)
+        return None
+    return doc['articles']
 
-class ScrapeResult(BaseModel):
-    source_name: str
-    articles_found: int
-    articles_added: int
-    status: str
 
+# ===================== RESPONSE CACHE =====================
 
-# ===================== AUTH HELPERS =====================
+response_cache = LRUTTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# Published content version. Bumped on every publish, so publishes made by
+# other processes also invalidate this process's cached responses.
+content_version = SharedVersion("content_version", RESPONSE_CACHE_VERSION_POLL)
 
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def get_content_version() -> int:
+    return await content_version.get()
 
 
-def create_access_token(data: dict) -> str:
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=JWT_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    return encoded_jwt
+async def bump_content_version():
+    await content_version.bump()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+async def cached_json_response(request: Request, key: tuple, build) -> Response:
+    """Serve ``build()`` from the response cache with an ETag.
 
+    ``build`` returns ``(payload, headers)``. Entries are keyed on the
+    normalized ``key`` plus the content version, so a publish makes every
+    older entry unreachable; a matching ``If-None-Match`` gets a 304.
+    """
+    version = await get_content_version()
+    entry = response_cache.get((version, *key))
+    if entry is None:
+        payload, headers = await build()
+        body = orjson.dumps(payload, default=str)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        entry = (etag, body, headers)
+        response_cache.set((version, *key), entry)
+    
+    etag, body, headers = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **headers}
+    if etag in [tag.strip().removeprefix('W/') for tag in request.headers.get('if-none-match', '').split(',')]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
-async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[dict]:
-    if credentials is None:
-        return None
-    try:
-        return await get_current_user(credentials)
-    except:
-        return None
 
+# ===================== COMPRESSION =====================
 
-# ===================== RSS SCRAPER =====================
+# Streams are flushed chunk by chunk and must reach the client unbuffered
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
 
-async def fetch_rss_feed(url: str) -> Optional[Dict]:
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    return feedparser.parse(content)
-    except Exception as e:
-        logger.error(f"Error fetching RSS feed {url}: {e}")
-    return None
 
+def accepted_encodings(header: str) -> set:
+    encodings = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
 
-async def extract_article_content(url: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Extract featured image first
-                    image_url = None
-                    
-                    # Try og:image meta tag
-                    og_image = soup.find('meta', property='og:image')
-                    if og_image and og_image.get('content'):
-                        image_url = og_image['content']
-                    
-                    # Try twitter:image meta tag
-                    if not image_url:
-                        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-                        if twitter_image and twitter_image.get('content'):
-                            image_url = twitter_image['content']
-                    
-                    # Try article:image meta tag
-                    if not image_url:
-                        article_image = soup.find('meta', property='article:image')
-                        if article_image and article_image.get('content'):
-                            image_url = article_image['content']
-                    
-                    # Try to find first large image in article content
-                    if not image_url:
-                        article_elem = soup.find(['article', 'main'])
-                        if article_elem:
-                            img = article_elem.find('img')
-                            if img and img.get('src'):
-                                img_src = img['src']
-                                # Make absolute URL if relative
-                                if img_src.startswith('//'):
-                                    img_src = 'https:' + img_src
-                                elif img_src.startswith('/'):
-                                    from urllib.parse import urlparse
-                                    parsed = urlparse(url)
-                                    img_src = f"{parsed.scheme}://{parsed.netloc}{img_src}"
-                                image_url = img_src
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style", "nav", "header", "footer"]):
-                        script.decompose()
-                    
-                    # Try to find main content
-                    content = None
-                    for tag in ['article', 'main', 'div[class*="content"]']:
-                        element = soup.find(tag)
-                        if element:
-                            content = element.get_text(separator='\n', strip=True)
-                            break
-                    
-                    if not content:
-                        content = soup.get_text(separator='\n', strip=True)
-                    
-                    # Clean up content
-                    lines = [line.strip() for line in content.split('\n') if line.strip()]
-                    content = '\n'.join(lines)
-                    
-                    # Get excerpt (first 300 chars)
-                    excerpt = content[:300] + "..." if len(content) > 300 else content
-                    
-                    return content[:15000], excerpt, image_url
-    except Exception as e:
-        logger.error(f"Error extracting content from {url}: {e}")
-    return None, None, None
 
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
 
-def calculate_read_time(text: str) -> int:
-    words = len(text.split())
-    return max(1, words // 200)
 
+class CompressionMiddleware:
+    """Brotli/gzip for complete response bodies of at least ``minimum_size``.
 
-async def scrape_source(source: dict) -> ScrapeResult:
-    try:
-        feed = await fetch_rss_feed(source['rss_url'])
-        if not feed or not feed.entries:
-            return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status="no_entries")
+    Only single-message bodies are compressed; streaming responses (SSE,
+    NDJSON, anything sent with ``more_body``) and already-encoded bodies are
+    passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
         
-        articles_found = len(feed.entries)
-        articles_added = 0
+        accepted = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
         
-        for entry in feed.entries[:10]:
-            try:
-                article_url = entry.get('link', '')
-                if not article_url:
-                    continue
-                
-                # Check if article already exists
-                existing = await db.articles.find_one({"url": article_url}, {"_id": 0})
-                if existing:
-                    continue
-                
-                # Extract content and image from article page
-                content, excerpt, scraped_image_url = await extract_article_content(article_url)
-                
-                # Get image - prioritize scraped image, fallback to RSS feed metadata
-                image_url = scraped_image_url
-                if not image_url and hasattr(entry, 'media_content') and entry.media_content:
-                    image_url = entry.media_content[0].get('url')
-                if not image_url and hasattr(entry, 'enclosures') and entry.enclosures:
-                    image_url = entry.enclosures[0].get('href')
-                
-                # Create article
-                article_data = {
-                    "id": str(uuid.uuid4()),
-                    "title": entry.get('title', 'Untitled'),
-                    "url": article_url,
-                    "source_id": source['id'],
-                    "source_name": source['name'],
-                    "content": content,
-                    "excerpt": excerpt,
-                    "image_url": image_url,
-                    "author": entry.get('author', None),
-                    "published_at": datetime(*entry.published_parsed[:6]).isoformat() if hasattr(entry, 'published_parsed') else None,
-                    "status": "pending",
-                    "categories": source.get('categories', []),
-                    "tags": [],
-                    "read_time_minutes": calculate_read_time(content) if content else 5,
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                }
-                
-                await db.articles.insert_one(article_data)
-                articles_added += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing article: {e}")
-                continue
+        start_message = None
         
-        # Update last_scrape timestamp
-        await db.sources.update_one(
-            {"id": source['id']},
-            {"$set": {"last_scrape": datetime.now(timezone.utc).isoformat()}}
-        )
+        async def send_compressed(message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            if start_message is None or message['type'] != 'http.response.body':
+                await send(message)
+                return
+            
+            start, start_message = start_message, None
+            body = message.get('body', b'')
+            headers = MutableHeaders(raw=start['headers'])
+            if (
+                message.get('more_body', False)
+                or len(body) < self.minimum_size
+                or 'content-encoding' in headers
+                or headers.get('content-type', '').startswith(UNCOMPRESSED_MEDIA_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+            
+            body = compress_body(body, encoding)
+            # Encoded bytes differ from the identity body, so a strong validator
+            # becomes weak (as nginx does); If-None-Match compares weakly
+            etag = headers.get('etag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = 'W/' + etag
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
         
-        return ScrapeResult(source_name=source['name'], articles_found=articles_found, articles_added=articles_added, status="success")
-    
-    except Exception as e:
-        logger.error(f"Error scraping source {source['name']}: {e}")
-        return ScrapeResult(source_name=source['name'], articles_found=0, articles_added=0, status=f"error: {str(e)}")
+        await self.app(scope, receive, send_compressed)
 
 
-# ===================== AI SUMMARIZER =====================
+# ===================== PROFILING =====================
 
-async def generate_summary(article_id: str) -> Optional[Summary]:
-    try:
-        article = await db.articles.find_one({"id": article_id}, {"_id": 0})
-        if not article or not article.get('content'):
-            return None
-        
-        chat = LlmChat(
-            api_key=os.environ.get('EMERGENT_LLM_KEY'),
-            session_id=f"summarize-{article_id}",
-            system_message="You are an expert news summarizer. Generate concise, insightful summaries of news articles."
-        ).with_model("anthropic", "claude-sonnet-4-5-20250929")
-        
-        prompt = f"""Analyze and summarize this news article:
+profiling_lock = asyncio.Lock()
 
-Title: {article['title']}
-Content: {article['content'][:8000]}
 
-Provide a structured summary in the following JSON format:
-{{
-    "executive_summary": "A 2-3 sentence overview of the article",
-    "key_points": ["Point 1", "Point 2", "Point 3", "Point 4"],
-    "analysis": "A brief analysis or context about why this matters",
-    "takeaways": ["Takeaway 1", "Takeaway 2", "Takeaway 3"]
-}}
+class RequestProfiler:
+    """Sampling profile via pyinstrument when installed, else a cProfile trace.
 
-Keep it concise and focused on the most important information."""
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+    cProfile traces the whole thread, so its report also includes any other
+    task that ran on the loop during the request.
+    """
+
+    def __init__(self):
+        if pyinstrument is not None:
+            self.profiler = pyinstrument.Profiler(interval=REQUEST_PROFILING_INTERVAL, async_mode="enabled")
+        else:
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if pyinstrument is not None:
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self) -> str:
+        if pyinstrument is not None:
+            self.profiler.stop()
+            return self.profiler.output_text(unicode=True)
+        self.profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(50)
+        return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """Answer requests carrying ``X-Profile`` with a profile report instead of the body.
+
+    Off unless REQUEST_PROFILING_ENABLED; when REQUEST_PROFILING_TOKEN is set
+    the header value must match it. The original status is returned in
+    ``X-Profiled-Status``. Streaming responses are passed through unprofiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        requested = Headers(scope=scope).get('x-profile') if scope['type'] == 'http' else None
+        if not REQUEST_PROFILING_ENABLED or not requested or (
+            REQUEST_PROFILING_TOKEN and not hmac.compare_digest(requested, REQUEST_PROFILING_TOKEN)
+        ):
+            await self.app(scope, receive, send)
+            return
         
-        # Parse JSON from response
-        import json
-        try:
-            # Try to extract JSON from response
-            response_text = str(response)
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                summary_data = json.loads(response_text[start_idx:end_idx])
-            else:
-                # Fallback
-                summary_data = {
-                    "executive_summary": response_text[:300],
-                    "key_points": ["Summary generated"],
-                    "analysis": "Analysis pending",
-                    "takeaways": ["See full article for details"]
-                }
-        except:
-            summary_data = {
-                "executive_summary": str(response)[:300],
-                "key_points": ["Summary generated"],
-                "analysis": "Analysis pending",
-                "takeaways": ["See full article for details"]
-            }
+        status_code = 500
+        streaming = False
         
-        summary = Summary(
-            article_id=article_id,
-            executive_summary=summary_data.get('executive_summary', ''),
-            key_points=summary_data.get('key_points', []),
-            analysis=summary_data.get('analysis', ''),
-            takeaways=summary_data.get('takeaways', [])
-        )
+        async def capture(message):
+            nonlocal status_code, streaming
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                streaming = Headers(raw=message['headers']).get('content-type', '').startswith(UNCOMPRESSED_MEDIA_TYPES)
+            if streaming:
+                await send(message)
         
-        await db.summaries.insert_one(summary.model_dump())
-        await db.articles.update_one({"id": article_id}, {"$set": {"status": "published"}})
+        # Profilers hook the interpreter globally; profile one request at a time
+        async with profiling_lock:
+            profiler = RequestProfiler()
+            profiler.start()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                report = profiler.stop()
+        if streaming:
+            return
         
-        return summary
-    
-    except Exception as e:
-        logger.error(f"Error generating summary for article {article_id}: {e}")
-        await db.articles.update_one({"id": article_id}, {"$set": {"status": "failed"}})
+        body = report.encode('utf-8')
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode('ascii')),
+                (b"x-profiled-status", str(status_code).encode('ascii')),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# ===================== MIGRATIONS =====================
+
+# Indexes are declared here and created by run_migrations(), which records a
+# fingerprint of the declarations in db.migrations. Processes booting
+# against an up-to-date database only read that fingerprint instead of
+# issuing every create_index call; a changed declaration (or ``migrate.py
+# --force``) runs the step again, under a lease so replicas starting
+# together do it once.
+INDEXES: List[tuple] = [
+    ("articles", "url", {"unique": True}),
+    ("articles", "status", {}),
+    ("articles", "categories", {}),
+    ("articles", [("status", 1), ("created_at", -1), ("id", -1)], {}),
+    ("articles", [("categories", 1), ("status", 1), ("created_at", -1), ("id", -1)], {}),
+    ("users", "email", {"unique": True}),
+    ("bookmarks", [("user_id", 1), ("article_id", 1)], {"unique": True}),
+    ("summary_jobs", "article_id", {"unique": True}),
+    ("summary_jobs", [("state", 1), ("run_at", 1)], {}),
+    ("summary_jobs", [("state", 1), ("locked_until", 1)], {}),
+    ("summary_cache", "fingerprint", {"unique": True}),
+    ("analytics_events", [("event_type", 1), ("timestamp", -1)], {}),
+    ("analytics_rollups", [("period", 1), ("event_type", 1), ("article_id", 1), ("bucket", -1)], {}),
+    ("rate_limits", "expires_at", {"expireAfterSeconds": 0}),
+]
+
+DEFAULT_SOURCES = [
+    {
+        "name": "TechCrunch",
+        "rss_url": "https://techcrunch.com/feed/",
+        "website_url": "https://techcrunch.com",
+        "description": "Technology news and analysis",
+        "priority": "high",
+        "categories": ["AI", "Apple", "Tesla", "Crypto"],
+    },
+    {
+        "name": "The Verge",
+        "rss_url": "https://www.theverge.com/rss/index.xml",
+        "website_url": "https://www.theverge.com",
+        "description": "Technology and culture",
+        "priority": "high",
+        "categories": ["AI", "Apple", "Tesla", "Climate"],
+    },
+    {
+        "name": "Wired",
+        "rss_url": "https://www.wired.com/feed/rss",
+        "website_url": "https://www.wired.com",
+        "description": "Technology and science",
+        "priority": "high",
+        "categories": ["AI", "Crypto", "Climate"],
+    },
+    {
+        "name": "Ars Technica",
+        "rss_url": "https://feeds.arstechnica.com/arstechnica/index",
+        "website_url": "https://arstechnica.com",
+        "description": "Technology and science news",
+        "priority": "medium",
+        "categories": ["AI", "Apple", "Tesla"],
+    },
+    {
+        "name": "Reuters",
+        "rss_url": "https://www.reutersagency.com/feed/?taxonomy=best-topics&post_type=best",
+        "website_url": "https://www.reuters.com",
+        "description": "Global news",
+        "priority": "medium",
+        "categories": ["Politics", "Finance", "Climate"],
+    },
+]
+
+
+def schema_fingerprint() -> str:
+    declared = {"indexes": INDEXES, "search_weights": SEARCH_INDEX_WEIGHTS}
+    return hashlib.sha256(json.dumps(declared, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+async def ensure_indexes():
+    for collection, keys, options in INDEXES:
+        await db[collection].create_index(keys, **options)
+    await ensure_search_index()
+
+
+async def seed_default_sources() -> int:
+    """Insert the default news sources into an empty sources collection."""
+    if await db.sources.count_documents({}, limit=1):
+        return 0
+    now = datetime.now(timezone.utc).isoformat()
+    await db.sources.insert_many([
+        {"id": str(uuid.uuid4()), **source, "is_active": True, "scrape_interval_minutes": 60, "created_at": now}
+        for source in DEFAULT_SOURCES
+    ])
+    logger.info("Seeded default news sources")
+    return len(DEFAULT_SOURCES)
+
+
+async def acquire_migration_lease() -> Optional[int]:
+    query = {"_id": "schema", "$or": [{"lease": {"$exists": False}}, {"lease.expires_at": {"$lte": utc_iso()}}]}
+    try:
+        doc = await db.migrations.find_one_and_update(
+            query,
+            {
+                "$set": {"lease.owner": lease_owner(), "lease.expires_at": utc_iso(MIGRATION_LOCK_SECONDS)},
+                "$inc": {"lease.token": 1},
+            },
+            projection={"_id": 0, "lease": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # The document exists and its lease is held
         return None
+    return doc['lease']['token']
+
+
+async def run_migrations(force: bool = False, wait: float = MIGRATION_LOCK_SECONDS) -> bool:
+    """Bring indexes and seed data up to date; returns whether the step ran here.
+
+    Safe to call from every process at boot. If another process is already
+    migrating, waits up to ``wait`` seconds for it to finish.
+    """
+    fingerprint = schema_fingerprint()
+    deadline = time.monotonic() + wait
+    while True:
+        state = await db.migrations.find_one({"_id": "schema"}, {"_id": 0, "fingerprint": 1}) or {}
+        if state.get('fingerprint') == fingerprint and not force:
+            return False
+        token = await acquire_migration_lease()
+        if token is not None:
+            break
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Timed out after {wait:.0f}s waiting for another process to finish migrating")
+        await asyncio.sleep(1)
+
+    started = time.perf_counter()
+    done = {"lease.expires_at": utc_iso()}
+    try:
+        async with LeaseHeartbeat(db.migrations, {"_id": "schema", "lease.token": token}, "lease.expires_at", MIGRATION_LOCK_SECONDS):
+            await ensure_indexes()
+            await seed_default_sources()
+        done.update({"fingerprint": fingerprint, "migrated_at": utc_iso()})
+    finally:
+        await db.migrations.update_one({"_id": "schema", "lease.token": token}, {"$set": done, "$inc": {"lease.token": 1}})
+    logger.info(f"Migrated schema to {fingerprint} in {time.perf_counter() - started:.2f}s")
+    return True
+
+
+# ===================== WORKERS =====================
+
+async def start_workers():
+    """Start this process's background scraping and summarization.
+
+    Does nothing when neither the scheduler nor summary workers are enabled,
+    so an API-only process never loads the scraping libraries or starts the
+    extract pool; an admin-triggered scrape still creates both on first use.
+    """
+    if not SCHEDULER_ENABLED and SUMMARY_WORKERS <= 0:
+        return
+    await get_http_session()
+    get_extract_pool()
+    rebuilt = await rebuild_category_timelines(only_missing=True)
+    if rebuilt:
+        logger.info(f"Built {len(rebuilt)} category timelines")
+    if SUMMARY_WORKERS > 0:
+        swept = await enqueue_pending_summaries()
+        if swept:
+            logger.info(f"Queued summaries for {swept} pending articles without a job")
+        summary_workers.start()
+    if SCHEDULER_ENABLED:
+        await scheduler.start()
+
+
+async def stop_workers():
+    await scheduler.stop()
+    await summary_workers.stop()
+    await close_http_session()
+    shutdown_extract_pool()
 
 
 # ===================== API ROUTES =====================
@@ -461,7 +3439,7 @@ async def register(user_data: UserRegister):
     )
     
     user_doc = user.model_dump()
-    user_doc['password_hash'] = hash_password(user_data.password)
+    user_doc['password_hash'] = await run_password_op(hash_password, user_data.password)
     
     await db.users.insert_one(user_doc)
     
@@ -476,7 +3454,7 @@ async def login(credentials: UserLogin):
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(credentials.password, user_doc['password_hash']):
+    if not await run_password_op(verify_password, credentials.password, user_doc['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_access_token({"sub": user_doc['id'], "email": user_doc['email']})
@@ -490,13 +3468,36 @@ async def get_me(current_user: dict = Depends(get_current_user)):
     return current_user
 
 
+USER_ROLES = {"viewer", "admin"}
+
+
+@api_router.put("/admin/users/{user_id}/role")
+async def update_user_role(user_id: str, update_data: UserRoleUpdate, current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if update_data.role not in USER_ROLES:
+        raise HTTPException(status_code=400, detail=f"Role must be one of: {', '.join(sorted(USER_ROLES))}")
+    
+    result = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$set": {"role": update_data.role}},
+        projection={"_id": 0, "password_hash": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await invalidate_cached_user(user_id)
+    return result
+
+
 # Source Routes
 @api_router.get("/sources", response_model=List[Source])
 async def get_sources(is_active: Optional[bool] = None):
     query = {}
     if is_active is not None:
         query['is_active'] = is_active
-    sources = await db.sources.find(query, {"_id": 0}).to_list(1000)
+    sources = await db.sources.find(query, {"_id": 0, "feed_high_water": 0, "feed_entry_failures": 0}).to_list(1000)
     return sources
 
 
@@ -507,6 +3508,7 @@ async def create_source(source_data: SourceCreate, current_user: dict = Depends(
     
     source = Source(**source_data.model_dump())
     await db.sources.insert_one(source.model_dump())
+    scheduler.upsert(source.model_dump())
     return source
 
 
@@ -529,6 +3531,7 @@ async def update_source(source_id: str, update_data: SourceUpdate, current_user:
         raise HTTPException(status_code=404, detail="Source not found")
     
     result.pop('_id', None)
+    scheduler.upsert(result)
     return result
 
 
@@ -541,17 +3544,80 @@ async def delete_source(source_id: str, current_user: dict = Depends(get_current
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Source not found")
     
+    scheduler.remove(source_id)
     return {"message": "Source deleted"}
 
 
 # Article Routes
+ARTICLE_FEED_SORT = [("created_at", -1), ("id", -1)]
+# List views never render the body, which is most of each document's size
+ARTICLE_LIST_PROJECTION = {"_id": 0, "content": 0}
+
+
+def article_list_projection(fields: Optional[str]) -> tuple[dict, bool]:
+    """Projection for a ``fields=`` list and whether to attach summaries.
+
+    Without ``fields`` lists get every field except ``content``. ``id`` and
+    ``created_at`` are always returned since paging depends on them.
+    """
+    if not fields:
+        return ARTICLE_LIST_PROJECTION, True
+    
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested - set(Article.model_fields) - {"summary"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    projection = {"_id": 0, "id": 1, "created_at": 1}
+    projection.update({field: 1 for field in requested if field != "summary"})
+    return projection, "summary" in requested
+
+
+def encode_article_cursor(article: dict) -> str:
+    return base64.urlsafe_b64encode(f"{article['created_at']}|{article['id']}".encode('utf-8')).decode('ascii')
+
+
+def decode_article_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, article_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        return created_at, article_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def attach_summaries(articles: List[dict]) -> List[dict]:
+    """Attach each article's summary with a single batched query."""
+    if not articles:
+        return articles
+    summaries = await db.summaries.find(
+        {"article_id": {"$in": [article['id'] for article in articles]}}, {"_id": 0}
+    ).to_list(None)
+    by_article = {summary['article_id']: summary for summary in summaries}
+    for article in articles:
+        summary = by_article.get(article['id'])
+        if summary:
+            article['summary'] = summary
+    return articles
+
+
 @api_router.get("/articles")
 async def get_articles(
+    request: Request,
     category: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ):
+    """List articles newest first, without ``content`` unless asked for.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to page
+    with a keyset on ``(created_at, id)``; ``offset`` still works but costs
+    more the deeper it goes. ``fields`` is a comma-separated list of article
+    fields (plus ``summary``) to return instead of the default list shape.
+    """
+    projection, include_summary = article_list_projection(fields)
     query = {}
     if category:
         query['categories'] = category
@@ -560,43 +3626,130 @@ async def get_articles(
     else:
         query['status'] = "published"
     
-    articles = await db.articles.find(query, {"_id": 0}).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
+    if cursor:
+        created_at, article_id = decode_article_cursor(cursor)
+        query['$or'] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": article_id}},
+        ]
     
-    # Attach summaries
-    for article in articles:
-        summary = await db.summaries.find_one({"article_id": article['id']}, {"_id": 0})
-        if summary:
-            article['summary'] = summary
+    async def build():
+        # First pages of the published feed come from the category timeline,
+        # unless fields the cards leave out (``content``) were asked for
+        carded = all(ARTICLE_LIST_PROJECTION.get(field, 1) for field in projection if field != "_id")
+        if query['status'] == "published" and not cursor and carded:
+            cards = await read_timeline(category, offset, limit)
+            if cards is not None:
+                headers = {'X-Next-Cursor': encode_article_cursor(cards[-1])} if len(cards) == limit else {}
+                if projection is not ARTICLE_LIST_PROJECTION:
+                    keep = set(projection) | ({"summary"} if include_summary else set())
+                    cards = [{field: value for field, value in card.items() if field in keep} for card in cards]
+                return cards, headers
+        
+        find = db.articles.find(query, projection).sort(ARTICLE_FEED_SORT)
+        if offset and not cursor:
+            find = find.skip(offset)
+        articles = await find.limit(limit).to_list(limit)
+        headers = {}
+        if articles and len(articles) == limit:
+            headers['X-Next-Cursor'] = encode_article_cursor(articles[-1])
+        if include_summary:
+            await attach_summaries(articles)
+        return articles, headers
     
-    return articles
+    # Only the published feed is invalidated on publish; other statuses change
+    # on every scrape and are always read live
+    if query['status'] != "published":
+        articles, headers = await build()
+        return ORJSONResponse(content=articles, headers=headers)
+    
+    key = ("articles", category, limit, 0 if cursor else offset, cursor, tuple(sorted(projection)), include_summary)
+    return await cached_json_response(request, key, build)
 
 
 @api_router.get("/articles/featured")
-async def get_featured_article():
-    article = await db.articles.find_one({"status": "published"}, {"_id": 0}, sort=[("created_at", -1)])
-    if article:
-        summary = await db.summaries.find_one({"article_id": article['id']}, {"_id": 0})
+async def get_featured_article(request: Request):
+    async def build():
+        article = await db.articles.find_one({"status": "published"}, {"_id": 0}, sort=ARTICLE_FEED_SORT)
+        if article:
+            await attach_summaries([article])
+        return article, {}
+    
+    return await cached_json_response(request, ("featured",), build)
+
+
+@api_router.get("/articles/{article_id}")
+async def get_article(request: Request, article_id: str):
+    async def build():
+        article = await db.articles.find_one({"id": article_id}, {"_id": 0})
+        if not article:
+            raise HTTPException(status_code=404, detail="Article not found")
+        
+        summary = await db.summaries.find_one({"article_id": article_id}, {"_id": 0})
         if summary:
             article['summary'] = summary
-    return article
+        
+        return article, {}
+    
+    return await cached_json_response(request, ("article", article_id), build)
 
 
-@api_router.get("/articles/{article_id}")
-async def get_article(article_id: str):
-    article = await db.articles.find_one({"id": article_id}, {"_id": 0})
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
+# Search Routes
+@api_router.get("/search")
+async def search_articles(
+    q: str,
+    category: Optional[str] = None,
+    source_id: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    fields: Optional[str] = None
+):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is required")
+    
+    projection, include_summary = article_list_projection(fields)
+    query = {"$text": {"$search": q}, "status": "published"}
+    if category:
+        query['categories'] = category
+    if source_id:
+        query['source_id'] = source_id
+    
+    score = {"$meta": "textScore"}
+    articles = await db.articles.find(
+        query, {**projection, "score": score}
+    ).sort([("score", score), ("created_at", -1)]).skip(offset).limit(limit).to_list(limit)
+    
+    return await attach_summaries(articles) if include_summary else articles
+
+
+@api_router.post("/admin/search/backfill")
+async def backfill_search(current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    summary = await db.summaries.find_one({"article_id": article_id}, {"_id": 0})
-    if summary:
-        article['summary'] = summary
+    updated = await backfill_search_key_points()
+    # Timeline cards carry the key points too
+    await rebuild_category_timelines()
+    await bump_content_version()
+    return {"message": "Search key points backfilled", "articles_updated": updated}
+
+
+@api_router.post("/admin/timelines/rebuild")
+async def rebuild_timelines(category: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    return article
+    if category:
+        rebuilt = {category: await rebuild_category_timeline(category)}
+    else:
+        rebuilt = await rebuild_category_timelines()
+    await bump_content_version()
+    return {"message": "Timelines rebuilt", "timelines": rebuilt}
 
 
 # Scraping Routes
 @api_router.post("/scrape")
-async def scrape_news(request: ScrapeRequest, background_tasks: BackgroundTasks, current_user: Optional[dict] = Depends(get_optional_user)):
+async def scrape_news(request: ScrapeRequest, current_user: Optional[dict] = Depends(get_optional_user)):
     if current_user and current_user.get('role') != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -608,20 +3761,88 @@ async def scrape_news(request: ScrapeRequest, background_tasks: BackgroundTasks,
     if not sources:
         raise HTTPException(status_code=404, detail="No active sources found")
     
-    results = []
-    for source in sources[:5]:  # Limit to 5 sources per request
-        result = await scrape_source(source)
-        results.append(result.model_dump())
-        
-        # Summarize new articles
-        if result.articles_added > 0:
-            articles = await db.articles.find({"source_id": source['id'], "status": "pending"}, {"_id": 0}).limit(result.articles_added).to_list(result.articles_added)
-            for article in articles:
-                background_tasks.add_task(generate_summary, article['id'])
+    if request.background:
+        job = start_scrape_job(sources)
+        return JSONResponse(status_code=202, content={
+            "job_id": job.id,
+            "total_sources": len(sources),
+            "status_url": f"/api/scrape/jobs/{job.id}",
+            "events_url": f"/api/scrape/jobs/{job.id}/events",
+        })
     
+    results = [result.model_dump() for result in await scrape_sources(sources)]
     return {"results": results, "total_sources": len(sources)}
 
 
+def get_scrape_job(job_id: str) -> ScrapeJob:
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job
+
+
+@api_router.get("/scrape/jobs/{job_id}")
+async def get_scrape_job_status(job_id: str, current_user: Optional[dict] = Depends(get_optional_user)):
+    if current_user and current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return get_scrape_job(job_id).snapshot()
+
+
+@api_router.get("/scrape/jobs/{job_id}/events")
+async def stream_scrape_job(
+    request: Request,
+    job_id: str,
+    format: str = "sse",
+    last_event_id: Optional[int] = None,
+    current_user: Optional[dict] = Depends(get_optional_user)
+):
+    """Stream a scrape job's events as SSE (default) or NDJSON (``format=ndjson``).
+
+    Reconnecting clients resume after ``Last-Event-ID`` (header, as sent by
+    EventSource) or the ``last_event_id`` query parameter.
+    """
+    if current_user and current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="Format must be sse or ndjson")
+    
+    job = get_scrape_job(job_id)
+    if last_event_id is None:
+        header = request.headers.get('last-event-id', '')
+        last_event_id = int(header) if header.isdigit() else 0
+    
+    return StreamingResponse(
+        stream_job_events(job, last_event_id, format),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.get("/admin/scheduler")
+async def get_scheduler_state(current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {**scheduler.snapshot(), "hosts": [breaker.snapshot() for breaker in host_breakers.values()]}
+
+
+@api_router.get("/admin/summary-queue")
+async def get_summary_queue(current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await summary_queue_stats()
+
+
+@api_router.get("/admin/cache")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {"responses": response_cache.stats(), "content_version": await get_content_version()}
+
+
 @api_router.post("/summarize/{article_id}")
 async def summarize_article(article_id: str, current_user: dict = Depends(get_current_user)):
     if current_user.get('role') != 'admin':
@@ -636,14 +3857,15 @@ async def summarize_article(article_id: str, current_user: dict = Depends(get_cu
 
 # Bookmark Routes
 @api_router.get("/bookmarks")
-async def get_bookmarks(current_user: dict = Depends(get_current_user)):
+async def get_bookmarks(fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    projection, include_summary = article_list_projection(fields)
     bookmarks = await db.bookmarks.find({"user_id": current_user['id']}, {"_id": 0}).to_list(1000)
     
     # Fetch article details
     article_ids = [b['article_id'] for b in bookmarks]
-    articles = await db.articles.find({"id": {"$in": article_ids}}, {"_id": 0}).to_list(len(article_ids))
+    articles = await db.articles.find({"id": {"$in": article_ids}}, projection).to_list(len(article_ids))
     
-    return articles
+    return await attach_summaries(articles) if include_summary else articles
 
 
 @api_router.post("/bookmarks/{article_id}")
@@ -670,7 +3892,7 @@ async def remove_bookmark(article_id: str, current_user: dict = Depends(get_curr
 async def track_event(event: AnalyticsEvent, current_user: Optional[dict] = Depends(get_optional_user)):
     if current_user:
         event.user_id = current_user['id']
-    await db.analytics_events.insert_one(event.model_dump())
+    analytics_buffer.add(event.model_dump())
     return {"message": "Event tracked"}
 
 
@@ -679,23 +3901,57 @@ async def get_stats(current_user: dict = Depends(get_current_user)):
     if current_user.get('role') != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_articles = await db.articles.count_documents({"status": "published"})
-    total_sources = await db.sources.count_documents({"is_active": True})
-    total_users = await db.users.count_documents({})
-    
-    # Recent analytics
-    page_views = await db.analytics_events.count_documents({"event_type": "page_view"})
-    article_reads = await db.analytics_events.count_documents({"event_type": "article_read"})
+    total_articles, total_sources, total_users, event_counts = await asyncio.gather(
+        db.articles.count_documents({"status": "published"}),
+        db.sources.count_documents({"is_active": True}),
+        db.users.estimated_document_count(),
+        # Pre-aggregated totals instead of scanning analytics_events
+        get_rollup_counts(["page_view", "article_read"]),
+    )
     
     return {
         "total_articles": total_articles,
         "total_sources": total_sources,
         "total_users": total_users,
-        "page_views": page_views,
-        "article_reads": article_reads
+        "page_views": event_counts['page_view'],
+        "article_reads": event_counts['article_read']
     }
 
 
+@api_router.get("/analytics/rollups")
+async def get_rollups(
+    event_type: str,
+    period: str = "day",
+    article_id: Optional[str] = None,
+    limit: int = 30,
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Period must be one of: {', '.join(ROLLUP_PERIODS)}")
+    
+    return await db.analytics_rollups.find(
+        {"period": period, "event_type": event_type, "article_id": article_id}, {"_id": 0}
+    ).sort("bucket", -1).limit(limit).to_list(limit)
+
+
+@api_router.post("/admin/analytics/rebuild-rollups")
+async def rebuild_rollups(current_user: dict = Depends(get_current_user)):
+    if current_user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    await analytics_buffer.flush()
+    await rebuild_analytics_rollups()
+    return {"message": "Analytics rollups rebuilt"}
+
+
+# Metrics Routes
+@api_router.get("/metrics")
+async def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Include router
 app.include_router(api_router)
 
@@ -705,87 +3961,24 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profiled-Status"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 async def startup_db():
-    # Create indexes
-    await db.articles.create_index("url", unique=True)
-    await db.articles.create_index("status")
-    await db.articles.create_index("categories")
-    await db.users.create_index("email", unique=True)
-    await db.bookmarks.create_index([("user_id", 1), ("article_id", 1)], unique=True)
-    
-    # Seed default sources if none exist
-    count = await db.sources.count_documents({})
-    if count == 0:
-        default_sources = [
-            {
-                "id": str(uuid.uuid4()),
-                "name": "TechCrunch",
-                "rss_url": "https://techcrunch.com/feed/",
-                "website_url": "https://techcrunch.com",
-                "description": "Technology news and analysis",
-                "priority": "high",
-                "is_active": True,
-                "scrape_interval_minutes": 60,
-                "categories": ["AI", "Apple", "Tesla", "Crypto"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "The Verge",
-                "rss_url": "https://www.theverge.com/rss/index.xml",
-                "website_url": "https://www.theverge.com",
-                "description": "Technology and culture",
-                "priority": "high",
-                "is_active": True,
-                "scrape_interval_minutes": 60,
-                "categories": ["AI", "Apple", "Tesla", "Climate"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Wired",
-                "rss_url": "https://www.wired.com/feed/rss",
-                "website_url": "https://www.wired.com",
-                "description": "Technology and science",
-                "priority": "high",
-                "is_active": True,
-                "scrape_interval_minutes": 60,
-                "categories": ["AI", "Crypto", "Climate"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Ars Technica",
-                "rss_url": "https://feeds.arstechnica.com/arstechnica/index",
-                "website_url": "https://arstechnica.com",
-                "description": "Technology and science news",
-                "priority": "medium",
-                "is_active": True,
-                "scrape_interval_minutes": 60,
-                "categories": ["AI", "Apple", "Tesla"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Reuters",
-                "rss_url": "https://www.reutersagency.com/feed/?taxonomy=best-topics&post_type=best",
-                "website_url": "https://www.reuters.com",
-                "description": "Global news",
-                "priority": "medium",
-                "is_active": True,
-                "scrape_interval_minutes": 60,
-                "categories": ["Politics", "Finance", "Climate"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-        ]
-        await db.sources.insert_many(default_sources)
-        logger.info("Seeded default news sources")
+    if MIGRATE_ON_STARTUP:
+        await run_migrations()
+    analytics_buffer.start()
+    await start_workers()
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await stop_workers()
+    await analytics_buffer.stop()
+    password_executor.shutdown(wait=False)
     client.close()
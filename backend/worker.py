@@ -0,0 +1,35 @@
+"""Worker entry point: scrapes sources and summarizes articles, serves no requests.
+
+Runs the source scheduler and the summary workers configured by the usual
+environment (SCHEDULER_ENABLED, SUMMARY_WORKERS, ...) until SIGINT or
+SIGTERM. Any number of workers can run beside any number of ``api.py``
+processes; leases keep them from doing the same work twice.
+
+Usage: python worker.py (from the backend directory)
+"""
+import asyncio
+import signal
+
+import server
+
+
+async def main():
+    if server.MIGRATE_ON_STARTUP:
+        await server.run_migrations()
+    await server.start_workers()
+    server.logger.info(
+        f"Worker ready: scheduler {'on' if server.SCHEDULER_ENABLED else 'off'}, {server.SUMMARY_WORKERS} summary workers"
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await server.stop_workers()
+        server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
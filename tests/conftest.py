@@ -0,0 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Checked before the benchmark helpers fill in a placeholder
+MONGO_CONFIGURED = "MONGO_URL" in os.environ
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# The benchmark helpers give the settings server reads at import harmless
+# defaults and point DB_NAME at BENCH_DB_NAME (default nooz_bench), so tests
+# never touch the application database. Unit tests do not use the database;
+# tests that need a real MongoDB ask for the ``mongo`` fixture and are skipped
+# unless MONGO_URL was set
+import benchmarks.common  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session")
+def mongo():
+    if not MONGO_CONFIGURED:
+        pytest.skip("MONGO_URL is not set")
+    return os.environ["MONGO_URL"]
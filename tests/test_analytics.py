@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["nooz_test"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+def event(n: int) -> dict:
+    return {
+        "event_type": "page_view" if n % 3 else "click",
+        "article_id": f"article-{n % 2}",
+        "timestamp": f"2024-01-01T10:0{n}:00+00:00",
+    }
+
+
+def test_flush_counts_each_stored_event_once(memory_db, monkeypatch):
+    events_class, rollups_class = type(memory_db.analytics_events), type(memory_db.analytics_rollups)
+    insert_many, bulk_write = events_class.insert_many, rollups_class.bulk_write
+    failures = {"insert": 1, "rollup": 1}
+
+    async def insert_partly(self, documents, **kwargs):
+        if failures["insert"]:
+            # The first half lands before the connection drops, so the retry
+            # sees those events as duplicates
+            failures["insert"] -= 1
+            await insert_many(self, documents[:len(documents) // 2], **kwargs)
+            raise AutoReconnect("connection reset")
+        return await insert_many(self, documents, **kwargs)
+
+    async def apply_partly(self, requests, **kwargs):
+        if failures["rollup"]:
+            failures["rollup"] -= 1
+            await bulk_write(self, requests[1:], **kwargs)
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 2, "errmsg": "injected"}]})
+        return await bulk_write(self, requests, **kwargs)
+
+    monkeypatch.setattr(events_class, "insert_many", insert_partly)
+    monkeypatch.setattr(rollups_class, "bulk_write", apply_partly)
+
+    async def run():
+        buffer = server.AnalyticsBuffer(max_size=100, interval=60)
+        for n in range(6):
+            buffer.add(event(n))
+        for _ in range(3):
+            await buffer.flush()
+        assert failures == {"insert": 0, "rollup": 0}
+        assert buffer._events == [] and buffer._rollups == []
+
+        stored = await memory_db.analytics_events.find({}, {"_id": 0}).to_list(None)
+        assert len(stored) == 6
+        for event_type in ("page_view", "click"):
+            expected = sum(1 for stored_event in stored if stored_event['event_type'] == event_type)
+            assert await server.get_rollup_counts([event_type]) == {event_type: expected}
+            for article_id in ("article-0", "article-1"):
+                expected = sum(
+                    1 for stored_event in stored
+                    if stored_event['event_type'] == event_type and stored_event['article_id'] == article_id
+                )
+                counts = await server.get_rollup_counts([event_type], period="day", bucket="2024-01-01", article_id=article_id)
+                assert counts == {event_type: expected}
+
+    asyncio.run(run())
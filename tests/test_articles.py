@@ -0,0 +1,35 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_cursor_round_trip():
+    article = {"id": "3f2c9a7e-1b4d-4c8e-9f00-123456789abc", "created_at": "2024-01-01T10:00:00.123456+00:00"}
+    cursor = server.encode_article_cursor(article)
+    assert server.decode_article_cursor(cursor) == (article['created_at'], article['id'])
+
+
+def test_cursor_is_url_safe():
+    # Bytes that base64 would encode with '+' and '/'
+    cursor = server.encode_article_cursor({"id": "\xfb\xff", "created_at": "?>?"})
+    assert not set(cursor) & set("+/")
+
+
+def test_cursor_keeps_separator_in_id():
+    article = {"id": "a|b", "created_at": "2024-01-01T10:00:00+00:00"}
+    assert server.decode_article_cursor(server.encode_article_cursor(article)) == (article['created_at'], "a|b")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"no separator").decode('ascii'),
+    base64.urlsafe_b64encode(b"\xff\xfe|x").decode('ascii'),
+    "é",
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as raised:
+        server.decode_article_cursor(cursor)
+    assert raised.value.status_code == 400
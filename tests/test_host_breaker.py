@@ -0,0 +1,97 @@
+import pytest
+
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(server.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(server, "HOST_HEALTH_WINDOW", 10)
+    monkeypatch.setattr(server, "HOST_CIRCUIT_MIN_REQUESTS", 4)
+    monkeypatch.setattr(server, "HOST_CIRCUIT_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(server, "HOST_CIRCUIT_OPEN_SECONDS", 60)
+    monkeypatch.setattr(server, "HOST_CIRCUIT_MAX_OPEN_SECONDS", 200)
+    monkeypatch.setattr(server, "HOST_CIRCUIT_PROBE_SECONDS", 30)
+    return server.HostBreaker("example.com")
+
+
+def test_breaker_stays_closed_below_min_requests(breaker):
+    for _ in range(3):
+        breaker.record(500, 0.1)
+    assert not breaker.blocked
+    breaker.allow()
+
+
+def test_breaker_opens_on_failure_rate(breaker, clock):
+    for status in (200, 500, 200, 500):
+        breaker.record(status, 0.1)
+    assert breaker.blocked
+    assert breaker.snapshot()['state'] == "open"
+    assert breaker.open_until == clock[0] + 60
+    with pytest.raises(server.HostCircuitOpen):
+        breaker.allow()
+
+
+def test_breaker_counts_429_and_missing_response_as_failures(breaker):
+    breaker.record(None, 0.1, error="ClientConnectorError: refused")
+    breaker.record(429, 0.1)
+    assert breaker.failure_rate == 1.0
+    assert breaker.last_error == "HTTP 429"
+    breaker.record(404, 0.1)
+    assert breaker.failure_rate == pytest.approx(2 / 3)
+
+
+def test_breaker_probe_success_closes(breaker, clock):
+    for _ in range(4):
+        breaker.record(500, 0.1)
+    clock[0] += 61
+    breaker.allow()
+    assert breaker.half_open
+    # Other requests wait for the probe
+    with pytest.raises(server.HostCircuitOpen):
+        breaker.allow()
+    breaker.record(200, 0.1)
+    assert breaker.snapshot()['state'] == "closed"
+    assert (breaker.trips, breaker.failure_rate) == (0, 0.0)
+    breaker.allow()
+
+
+def test_breaker_probe_failure_reopens_with_backoff(breaker, clock):
+    for _ in range(4):
+        breaker.record(500, 0.1)
+    clock[0] += 61
+    breaker.allow()
+    breaker.record(503, 0.1)
+    assert breaker.trips == 2 and not breaker.half_open
+    assert breaker.open_until == clock[0] + 120
+    clock[0] += 121
+    breaker.allow()
+    breaker.record(None, 0.1, error="TimeoutError: ")
+    # Capped at HOST_CIRCUIT_MAX_OPEN_SECONDS
+    assert breaker.open_until == clock[0] + 200
+
+
+def test_breaker_honours_retry_after(breaker, clock):
+    breaker.record(429, 0.1, retry_after="90")
+    assert breaker.blocked
+    assert breaker.open_until == clock[0] + 90
+
+
+def test_breaker_failures_in_flight_do_not_trip_again(breaker):
+    for _ in range(4):
+        breaker.record(500, 0.1)
+    breaker.record(500, 0.1)
+    assert breaker.trips == 1
+
+
+def test_breaker_latency_ewma(breaker, monkeypatch):
+    monkeypatch.setattr(server, "HOST_LATENCY_EWMA_ALPHA", 0.5)
+    breaker.record(200, 1.0)
+    breaker.record(200, 3.0)
+    assert breaker.latency_ewma == pytest.approx(2.0)
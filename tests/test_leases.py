@@ -0,0 +1,41 @@
+"""Several processes scraping and summarizing against one real MongoDB.
+
+Runs benchmarks.bench_leases at a small scale, so it needs MONGO_URL to
+point at a MongoDB server. Like the benchmark it uses the BENCH_DB_NAME
+database, whose active sources the schedulers all pick up.
+"""
+import asyncio
+
+from benchmarks import bench_leases
+
+import server
+
+SOURCES = 6
+ITEMS = 4
+ARTICLES = 60
+PROCESSES = [1, 3]
+
+
+async def run_benchmark() -> tuple:
+    results = await bench_leases.main(PROCESSES, SOURCES, ITEMS, ARTICLES, workers=2, latency=0.2)
+    return results, await server.db.summary_jobs.count_documents({})
+
+
+def test_no_duplicate_work_across_processes(mongo):
+    # One event loop throughout: the Motor client binds to the first one
+    results, remaining_jobs = asyncio.run(run_benchmark())
+    for processes, result in results.items():
+        scrape, summarize = result['scrape'], result['summarize']
+        assert scrape['duplicate_fetches'] == 0, processes
+        assert scrape['feed_fetches'] == SOURCES, processes
+        assert scrape['page_fetches'] == SOURCES * ITEMS, processes
+        assert summarize['llm_calls_per_article'] == 1.0, processes
+        assert summarize['summaries_per_article'] == 1.0, processes
+    
+    # Summaries wait on the fake LLM, so throughput should grow close to
+    # linearly with the processes; two thirds of linear leaves room for noise
+    single = results[1]['summarize']['articles_per_second']
+    assert results[3]['summarize']['articles_per_second'] >= 2 * single
+    
+    # Jobs queued for the articles the benchmark scraped and deleted are gone too
+    assert remaining_jobs == 0
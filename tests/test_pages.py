@@ -0,0 +1,157 @@
+import asyncio
+import codecs
+
+import pytest
+
+import server
+
+CHUNK_SIZES = [1, 2, 3, 7, 16, 64, 4096]
+
+STORY = (
+    b"<html><head><title>t</title></head><body><nav>menu</nav>"
+    b"<article class='story'><p>Lead</p>"
+    b"<aside><article class='card'>Related</article></aside>"
+    b"<main><p>Body</p></main>"
+    b"</article>"
+    b"<footer><article>Most read</article></footer></body></html>"
+)
+STORY_END = STORY.index(b"</article><footer>") + len(b"</article>")
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, content_type="text/html", charset=None, content_length=None):
+        self.headers = {"Content-Type": content_type} if content_type else {}
+        self.content_type = content_type or "application/octet-stream"
+        self.charset = charset
+        self.content_length = content_length
+        self.content = FakeContent(body)
+
+
+def scan_in_chunks(page: bytes, size: int):
+    scanner = server.ArticleEndScanner()
+    body = bytearray()
+    for start in range(0, len(page), size):
+        body += page[start:start + size]
+        end = scanner.scan(body)
+        if end is not None:
+            return end
+    return None
+
+
+def read(response, stop_early=False):
+    return asyncio.run(server.read_page(response, stop_early))
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_scanner_finds_end_of_outermost_article(size):
+    assert scan_in_chunks(STORY, size) == STORY_END
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_scanner_matches_tags_case_insensitively_and_with_attributes(size):
+    page = b"<div><MAIN id='x'>a<Article\n data-x='1'>b</ARTICLE>c</Main>tail"
+    assert scan_in_chunks(page, size) == page.index(b"tail")
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_scanner_ignores_lookalike_tags(size):
+    page = b"<articles>x</articles><mainframe>y</mainframe><article>z</article>tail"
+    assert scan_in_chunks(page, size) == page.index(b"tail")
+
+
+@pytest.mark.parametrize("page", [
+    b"<html><body><p>No article here</p></body></html>",
+    b"<article><p>Never closed",
+    b"</article><p>Stray close tag</p>",
+])
+def test_scanner_without_a_closed_article(page):
+    assert scan_in_chunks(page, 5) is None
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_read_page_stops_after_article(monkeypatch, size):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", size)
+    html, encoding, fetched, outcome = read(FakeResponse(STORY), stop_early=True)
+    assert outcome == "early_stop"
+    assert html == STORY[:STORY_END]
+    assert encoding == "utf-8"
+    assert STORY_END <= fetched < STORY_END + size
+
+
+def test_read_page_drains_small_declared_bodies(monkeypatch):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", 16)
+    response = FakeResponse(STORY, content_length=len(STORY))
+    html, _, fetched, outcome = read(response, stop_early=True)
+    assert outcome == "early_stop"
+    assert html == STORY[:STORY_END]
+    assert fetched == len(STORY)
+
+
+def test_read_page_reads_whole_page_without_early_stop(monkeypatch):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", 16)
+    assert read(FakeResponse(STORY)) == (STORY, "utf-8", len(STORY), "ok")
+
+
+@pytest.mark.parametrize("size", [1, 10, 100, 1000])
+def test_read_page_truncates_at_byte_cap(monkeypatch, size):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", size)
+    monkeypatch.setattr(server, "PAGE_MAX_BYTES", 100)
+    page = b"<html>" + b"x" * 500
+    html, _, fetched, outcome = read(FakeResponse(page), stop_early=True)
+    assert outcome == "truncated"
+    assert html == page[:100]
+    assert 100 <= fetched < 100 + size
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(b"<html></html>", content_type="application/pdf"),
+    FakeResponse(b"%PDF-1.7\n\0\0binary", content_type="text/html"),
+    FakeResponse(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR", content_type=None),
+], ids=["content_type", "mislabeled", "no_content_type"])
+def test_read_page_rejects_binary(monkeypatch, response):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", 4096)
+    html, encoding, _, outcome = read(response)
+    assert (html, encoding, outcome) == (None, None, "not_html")
+
+
+def test_read_page_keeps_utf16_pages(monkeypatch):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", 4096)
+    page = codecs.BOM_UTF16_LE + "<html><p>Grüße</p></html>".encode("utf-16-le")
+    html, encoding, _, outcome = read(FakeResponse(page))
+    assert (html, encoding, outcome) == (page, "utf-16", "ok")
+
+
+def test_read_page_sniffs_charset_of_kept_bytes(monkeypatch):
+    monkeypatch.setattr(server, "PAGE_CHUNK_BYTES", 4096)
+    page = b'<html><head><meta charset="iso-8859-1"></head><body>caf\xe9</body></html>'
+    _, encoding, _, _ = read(FakeResponse(page, charset="windows-1252"))
+    assert encoding == "windows-1252"
+
+
+@pytest.mark.parametrize("header, head, expected", [
+    (None, b"<html>", "utf-8"),
+    ("ISO-8859-1", b"<html>", "iso-8859-1"),
+    (None, b'<meta charset="Shift_JIS">', "shift_jis"),
+    (None, b"<meta http-equiv='Content-Type' content='text/html; charset=koi8-r'>", "koi8-r"),
+    ("windows-1252", b'<meta charset="koi8-r">', "windows-1252"),
+    ("no-such-charset", b'<meta charset="koi8-r">', "koi8-r"),
+    ("no-such-charset", b'<meta charset="also-bogus">', "utf-8"),
+    ("windows-1252", codecs.BOM_UTF8 + b'<meta charset="koi8-r">', "utf-8"),
+    ("utf-8", codecs.BOM_UTF16_LE + b"<\0h\0", "utf-16"),
+    ("utf-8", codecs.BOM_UTF16_BE + b"\0<\0h", "utf-16"),
+    (None, b" " * 1024 + b'<meta charset="koi8-r">', "utf-8"),
+], ids=[
+    "default", "header", "meta", "http_equiv", "header_over_meta", "bad_header",
+    "all_bad", "utf8_bom", "utf16le_bom", "utf16be_bom", "meta_past_1024",
+])
+def test_sniff_charset_precedence(header, head, expected):
+    assert server.sniff_charset(header, head) == expected
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+BASE = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def candidates(*minutes):
+    """A scrape batch of entries ``g<n>`` published ``n`` minutes after BASE; None means undated."""
+    return [
+        (f"https://example.com/{n}", ({}, f"g{n}", BASE + timedelta(minutes=n) if n is not None else None))
+        for n in minutes
+    ]
+
+
+def test_high_water_mark_all_done():
+    batch = candidates(1, 2, 3)
+    assert server.high_water_mark(batch, {"g1", "g2", "g3"}, None) == BASE + timedelta(minutes=3)
+
+
+def test_high_water_mark_stops_before_oldest_pending():
+    batch = candidates(1, 2, 3, 4)
+    assert server.high_water_mark(batch, {"g1", "g3", "g4"}, None) == BASE + timedelta(minutes=1)
+
+
+def test_high_water_mark_keeps_previous_mark_when_oldest_is_pending():
+    newest = BASE
+    batch = candidates(1, 2, 3)
+    assert server.high_water_mark(batch, {"g2", "g3"}, newest) == newest
+
+
+def test_high_water_mark_nothing_done():
+    assert server.high_water_mark(candidates(1, 2), set(), None) is None
+
+
+def test_high_water_mark_ignores_undated_entries():
+    batch = candidates(None, 1, 2)
+    # An undated pending entry does not hold the mark back, and an undated
+    # done one does not move it
+    assert server.high_water_mark(batch, {"g1", "g2"}, None) == BASE + timedelta(minutes=2)
+    assert server.high_water_mark(batch, {"gNone"}, BASE) == BASE
@@ -0,0 +1,86 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('```\n[1, 2]\n```', [1, 2]),
+    ('Here is the summary:\n{"a": {"b": [1]}}\nHope this helps!', {"a": {"b": [1]}}),
+    ('Note {not json} then {"a": 2}', {"a": 2}),
+    ('[{"id": "A1"}] trailing', [{"id": "A1"}]),
+    ('no json at all', None),
+    ('', None),
+])
+def test_parse_llm_json(text, expected):
+    assert server.parse_llm_json(text) == expected
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Replace the LLM client with one that answers with ``llm.reply`` and records prompts."""
+    state = SimpleNamespace(reply="", prompts=[])
+
+    class ScriptedChat:
+        def __init__(self, **kwargs):
+            pass
+
+        def with_model(self, provider, model):
+            return self
+
+        async def send_message(self, message):
+            state.prompts.append(message.text)
+            return state.reply
+
+    monkeypatch.setattr(server, "LlmChat", ScriptedChat)
+    monkeypatch.setattr(server, "UserMessage", lambda text: SimpleNamespace(text=text))
+    # The limiter keeps its counters in MongoDB; a zero rate never touches it
+    monkeypatch.setattr(server, "llm_rate_limiter", server.SharedRateLimiter("test-llm", 0, 1))
+    return state
+
+
+def article(n):
+    return {"id": f"article-{n}", "title": f"Title {n}", "content": f"Content {n}", "source_name": "Test"}
+
+
+def entry(label, text):
+    return {"id": label, "executive_summary": text, "key_points": ["p"], "analysis": "a", "takeaways": "t"}
+
+
+def test_summarize_batch_maps_labels_to_articles(llm):
+    articles = [article(n) for n in range(3)]
+    llm.reply = json.dumps({"summaries": [entry("A3", "third"), entry(" A1 ", "first"), entry("A2", "second")]})
+    summaries = asyncio.run(server.summarize_batch(articles))
+    assert {article_id: summary.executive_summary for article_id, summary in summaries.items()} == {
+        "article-0": "first", "article-1": "second", "article-2": "third",
+    }
+    assert summaries["article-0"].takeaways == ["t"]
+    assert "=== Article A2 ===\nTitle: Title 1" in llm.prompts[0]
+
+
+def test_summarize_batch_accepts_bare_list(llm):
+    llm.reply = "```json\n" + json.dumps([entry("A1", "only")]) + "\n```"
+    summaries = asyncio.run(server.summarize_batch([article(0), article(1)]))
+    assert list(summaries) == ["article-0"]
+
+
+def test_summarize_batch_drops_unknown_and_invalid_entries(llm):
+    llm.reply = json.dumps({"summaries": [
+        entry("A9", "unknown label"),
+        entry("article-1", "id instead of label"),
+        {"id": "A2", "executive_summary": "  "},
+        "not an object",
+        entry("A1", "kept"),
+    ]})
+    summaries = asyncio.run(server.summarize_batch([article(0), article(1)]))
+    assert {article_id: summary.executive_summary for article_id, summary in summaries.items()} == {"article-0": "kept"}
+
+
+def test_summarize_batch_unparseable_reply(llm):
+    llm.reply = "Sorry, I can't help with that."
+    assert asyncio.run(server.summarize_batch([article(0), article(1)])) == {}
@@ -0,0 +1,35 @@
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Example.COM/news/story", "https://example.com/news/story"),
+    ("https://example.com:443/a", "https://example.com/a"),
+    ("http://example.com:80/a", "http://example.com/a"),
+    ("http://example.com:8080/a", "http://example.com:8080/a"),
+    ("https://example.com/a#comments", "https://example.com/a"),
+    ("https://example.com/a?utm_source=rss&utm_MEDIUM=feed&id=7", "https://example.com/a?id=7"),
+    ("https://example.com/a?fbclid=x&gclid=y&ref=home", "https://example.com/a"),
+    ("https://example.com/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a?empty=", "https://example.com/a?empty="),
+    ("https://amp.example.com/a", "https://example.com/a"),
+    ("https://example.com/amp/a", "https://example.com/a"),
+    ("https://example.com/a/amp", "https://example.com/a"),
+    ("https://example.com/a/amp/", "https://example.com/a"),
+    ("https://example.com/amplify/a", "https://example.com/amplify/a"),
+    ("https://example.com", "https://example.com/"),
+    ("  https://example.com/a  ", "https://example.com/a"),
+])
+def test_canonicalize_url(url, expected):
+    assert server.canonicalize_url(url) == expected
+
+
+def test_canonicalize_url_dedupes_variants():
+    variants = [
+        "https://www.example.com/story?utm_source=twitter",
+        "https://WWW.example.com/story#top",
+        "https://www.example.com:443/story?fbclid=abc",
+        "https://www.example.com/story/amp",
+    ]
+    assert {server.canonicalize_url(url) for url in variants} == {"https://www.example.com/story"}